@@ -1,31 +1,166 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.driver_finder import DriverFinder
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.remote.client_config import ClientConfig
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import json
+import orjson
+import re
 import traceback
 import time # Import time for potential delays between pages
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.parser import HTMLParser
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/114.0.0.0 Safari/537.36"
+)
+# Text that only shows up on an anti-bot interstitial, not on real archive pages
+CHALLENGE_MARKERS = ("cf-chl", "challenge-platform", "<title>Just a moment...</title>")
+# Number of headless Chrome instances kept alive and reused across threads (Selenium fallback only)
+DRIVER_POOL_SIZE = 4
+# We only read DOM text and img src attributes, so Chrome never needs to fetch these
+BLOCKED_RESOURCE_URLS = ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.webm", "*.mp4", "*.css", "*.woff*", "*.ttf", "*.svg"]
+
+def make_session_with_retries(
+    total_retries: int = 3,
+    backoff_factor: float = 0.5,
+    status_forcelist: tuple = (500, 502, 504),
+) -> requests.Session:
+    # Same retry policy as ocr_extractor's session; 503 is left out because that's
+    # what a challenge page comes back with
+    session = requests.Session()
+    retry = Retry(
+        total=total_retries,
+        read=total_retries,
+        connect=total_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET']),
+    )
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
 
-def get_thread_urls_from_archive_page(archive_url):
+session = make_session_with_retries()
+
+def execute_cdp_cmd(driver, cmd, params):
+    # webdriver.Remote has no execute_cdp_cmd, but ChromeRemoteConnection knows the endpoint
+    return driver.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+
+def make_driver(service):
+    """
+    Launches a headless Chrome instance configured for scraping 4plebs, as a new
+    session on an already running chromedriver `service`.
     """
-    Navigates to a 4plebs archive page and extracts the URLs of individual threads.
+    opts = Options()
+    # New headless mode is the full browser without a window, and starts faster than the legacy one
+    opts.add_argument("--headless=new")
+    opts.add_argument("window-size=1920,1080")
+    opts.add_argument(f"user-agent={USER_AGENT}")
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    # Nothing is rendered on screen, and /dev/shm is tiny in containers
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--disable-dev-shm-usage")
+    # Skip background work Chrome does on startup and in idle tabs
+    opts.add_argument("--disable-extensions")
+    opts.add_argument("--disable-background-networking")
+    opts.add_argument("--disable-renderer-backgrounding")
+    opts.add_argument("--disable-features=Translate,BackForwardCache")
+    client_config = ClientConfig(remote_server_addr=service.service_url)
+    driver = webdriver.Remote(command_executor=ChromeRemoteConnection(client_config=client_config), options=opts)
+    # Block media, stylesheets and fonts at the network layer so page loads finish sooner
+    execute_cdp_cmd(driver, "Network.enable", {})
+    execute_cdp_cmd(driver, "Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_URLS})
+    return driver
+
+def make_driver_pool(service, size=DRIVER_POOL_SIZE):
+    """
+    Starts `size` Chrome instances up front so each scrape borrows an already
+    running browser instead of paying Chrome's startup cost per URL.
+    """
+    pool = queue.Queue()
+    for _ in range(size):
+        pool.put(make_driver(service))
+    return pool
+
+def close_driver_pool(pool):
+    while not pool.empty():
+        try:
+            pool.get_nowait().quit()
+        except Exception:
+            pass
+
+# Chrome is only started if 4plebs serves us a challenge page, so the pool is created on first use.
+# All pooled browsers are sessions on one chromedriver process rather than one chromedriver each.
+_chrome_service = None
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    global _chrome_service, _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            print("Starting Chrome driver pool for the Selenium fallback...")
+            # Selenium Manager only resolves chromedriver inside webdriver.Chrome, so a service
+            # started on its own needs the path looked up first
+            driver_path = DriverFinder(Service(), Options()).get_driver_path()
+            _chrome_service = Service(executable_path=driver_path)
+            _chrome_service.start()
+            _driver_pool = make_driver_pool(_chrome_service)
+    return _driver_pool
+
+def run_with_pooled_driver(pool, scrape_fn, url):
+    """Borrows a driver from `pool`, runs `scrape_fn(url, driver)` and returns the driver."""
+    driver = pool.get()
+    try:
+        try:
+            driver.delete_all_cookies() # Don't carry state over from the previous page
+        except Exception:
+            pass
+        return scrape_fn(url, driver)
+    finally:
+        pool.put(driver)
+
+def load_scraped_thread_urls(output_filename):
+    """
+    Returns the post_urls of threads already saved to the JSONL output, so an interrupted
+    run can resume. A partial last line left behind by a crash is truncated.
+    """
+    try:
+        with open(output_filename, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return set()
+    complete = content[:content.rfind(b"\n") + 1]
+    if len(complete) != len(content):
+        with open(output_filename, "wb") as f:
+            f.write(complete)
+    return {orjson.loads(line).get("post_url") for line in complete.splitlines() if line.strip()}
+
+def get_thread_urls_with_selenium(archive_url, driver):
+    """
+    Navigates to a 4plebs archive page in Chrome and extracts the URLs of individual threads.
     
     Args:
         archive_url (str): The URL of the 4plebs archive page (e.g., a timetravel page).
+        driver: A Selenium WebDriver to load the page with (e.g., borrowed from the driver pool).
 
     Returns:
         list: A list of individual thread URLs found on the archive page.
     """
-    opts = Options()
-    opts.add_argument("--headless")
-    opts.add_argument("window-size=1920,1080")
-    opts.add_argument(
-        "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/114.0.0.0 Safari/537.36"
-    )
-    driver = webdriver.Chrome(options=opts)
     thread_urls = []
     try:
         driver.get(archive_url)
@@ -60,30 +195,47 @@ def get_thread_urls_from_archive_page(archive_url):
         traceback.print_exc()
         return []
 
-    finally:
-        driver.quit()
-
-def scrape_pol_thread(thread_url):
+# Walks a loaded thread page and returns the OP and all replies in one JSON blob.
+# innerText matches what Selenium's .text returns; missing elements come back as null.
+EXTRACT_THREAD_JS = """
+const th = document.querySelector("article.clearfix.thread");
+const text = (el, sel) => { const n = el.querySelector(sel); return n ? n.innerText : null; };
+const time = (el) => el.querySelector("time");
+const srcs = (el, sel) => Array.from(el.querySelectorAll(sel), img => img.src);
+const tm = time(th);
+return {
+  post_id: th.id,
+  author_id: text(th, "span.poster_hash"),
+  text: text(th, "div.text"),
+  timestamp_raw: tm ? tm.innerText : null,
+  timestamp_iso: tm ? tm.getAttribute("datetime") : null,
+  image_urls: srcs(th, "img.thread_image, img.post_image"),
+  replies: Array.from(th.querySelectorAll("aside.posts article"), ra => {
+    const rt = time(ra);
+    return {
+      reply_id: ra.id,
+      reply_text: text(ra, "div.text"),
+      reply_timestamp_raw: rt ? rt.innerText : null,
+      reply_timestamp_iso: rt ? rt.getAttribute("datetime") : null,
+      image_urls: srcs(ra, "img.post_image"),
+    };
+  }),
+};
+"""
+
+def scrape_pol_thread_with_selenium(thread_url, driver):
     """
-    Navigates to a single 4plebs thread URL and scrapes all its content,
+    Navigates to a single 4plebs thread URL in Chrome and scrapes all its content,
     including the original post and all replies.
 
     Args:
         thread_url (str): The direct URL to a specific 4plebs thread.
+        driver: A Selenium WebDriver to load the page with (e.g., borrowed from the driver pool).
 
     Returns:
         dict: A dictionary containing the scraped data for the thread,
               or an empty dictionary if an error occurs.
     """
-    opts = Options()
-    opts.add_argument("--headless")
-    opts.add_argument("window-size=1920,1080")
-    opts.add_argument(
-        "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/114.0.0.0 Safari/537.36"
-    )
-    driver = webdriver.Chrome(options=opts)
     try:
         driver.get(thread_url)
 
@@ -100,64 +252,28 @@ def scrape_pol_thread(thread_url):
             EC.presence_of_element_located((By.CSS_SELECTOR, "article.clearfix.thread"))
         )
 
-        # Get the main thread element (OP)
-        th = driver.find_element(By.CSS_SELECTOR, "article.clearfix.thread")
-        
-        thread_data = {}
-
-        def fix_image_urls(urls):
-            return [url.replace("s.jpg", ".jpg") if url.endswith("s.jpg") else url for url in urls]
+        # Pull the OP and every reply out in one script call; each find_element would
+        # otherwise be its own round-trip to chromedriver
+        raw = driver.execute_script(EXTRACT_THREAD_JS)
 
         op = {}
-        post_id = th.get_attribute("id")
-        op["post_id"] = post_id
+        op["post_id"] = raw["post_id"]
         op["post_url"] = thread_url # The input URL is the post URL
+        op["author_id"] = raw["author_id"].replace("ID:", "").strip() if raw["author_id"] is not None else None
+        op["text"] = raw["text"].strip() if raw["text"] is not None else None
+        op["timestamp_raw"] = raw["timestamp_raw"]
+        op["timestamp_iso"] = raw["timestamp_iso"]
+        op["image_urls"] = fix_image_urls(raw["image_urls"])
 
-        try:
-            op["author_id"] = th.find_element(
-                By.CSS_SELECTOR, "span.poster_hash"
-            ).text.replace("ID:", "").strip()
-        except:
-            op["author_id"] = None
-
-        try:
-            op["text"] = th.find_element(
-                By.CSS_SELECTOR, "div.text"
-            ).text.strip()
-        except:
-            op["text"] = None
-
-        try:
-            tm = th.find_element(By.CSS_SELECTOR, "time")
-            op["timestamp_raw"] = tm.text
-            op["timestamp_iso"] = tm.get_attribute("datetime")
-        except:
-            op["timestamp_raw"] = op["timestamp_iso"] = None
-
-        imgs = th.find_elements(By.CSS_SELECTOR, "img.thread_image, img.post_image")
-        op["image_urls"] = fix_image_urls([img.get_attribute("src") for img in imgs])
-
-        # Scrape all replies (they should be fully loaded on a direct thread page)
-        reply_articles = th.find_elements(By.CSS_SELECTOR, "aside.posts article")
-        op["reply_count"] = len(reply_articles)
+        op["reply_count"] = len(raw["replies"])
         op["replies"] = []
-        for ra in reply_articles:
+        for ra in raw["replies"]:
             r = {}
-            r["reply_id"] = ra.get_attribute("id")
-            try:
-                r["reply_text"] = ra.find_element(
-                    By.CSS_SELECTOR, "div.text"
-                ).text.strip()
-            except:
-                r["reply_text"] = None
-            try:
-                rt = ra.find_element(By.CSS_SELECTOR, "time")
-                r["reply_timestamp_raw"] = rt.text
-                r["reply_timestamp_iso"] = rt.get_attribute("datetime")
-            except:
-                r["reply_timestamp_raw"] = r["reply_timestamp_iso"] = None
-            rimgs = ra.find_elements(By.CSS_SELECTOR, "img.post_image")
-            r["image_urls"] = fix_image_urls([img.get_attribute("src") for img in rimgs])
+            r["reply_id"] = ra["reply_id"]
+            r["reply_text"] = ra["reply_text"].strip() if ra["reply_text"] is not None else None
+            r["reply_timestamp_raw"] = ra["reply_timestamp_raw"]
+            r["reply_timestamp_iso"] = ra["reply_timestamp_iso"]
+            r["image_urls"] = fix_image_urls(ra["image_urls"])
             op["replies"].append(r)
 
         thread_data = op # The main thread data itself contains the replies
@@ -170,8 +286,142 @@ def scrape_pol_thread(thread_url):
         traceback.print_exc()
         return {}
 
-    finally:
-        driver.quit()
+# Thumbnail URLs end in "s.jpg"; the full-size image drops the "s"
+THUMBNAIL_SUFFIX_RE = re.compile(r"s\.jpg$")
+
+def fix_image_urls(urls):
+    # Swap thumbnail URLs (...s.jpg) for the full-size image
+    return [THUMBNAIL_SUFFIX_RE.sub(".jpg", url) for url in urls]
+
+def fetch_page_html(url):
+    """
+    Fetches a page over plain HTTP. 4plebs pages are server-rendered, so no browser is
+    needed to read them. Returns None if the response looks like an anti-bot challenge.
+    """
+    resp = session.get(url, timeout=20)
+    if resp.status_code in (403, 503) or any(marker in resp.text for marker in CHALLENGE_MARKERS):
+        return None
+    resp.raise_for_status()
+    return resp.text
+
+def node_text(node):
+    """Text content of a selectolax node with <br> as newlines, like Selenium's .text."""
+    if node is None:
+        return None
+    for br in node.css("br"):
+        br.replace_with("\n")
+    return node.text().strip()
+
+def parse_archive_page(html):
+    """Extracts thread URLs from the HTML of a 4plebs archive page."""
+    thread_urls = []
+    for th in HTMLParser(html).css("article.clearfix.thread"):
+        post_id = th.attributes.get("id")
+        if post_id:
+            # 4plebs thread URLs are typically /board/thread/ID/
+            thread_urls.append(f"https://archive.4plebs.org/pol/thread/{post_id}/")
+    return thread_urls
+
+def parse_thread_page(html, thread_url):
+    """
+    Extracts the OP and all replies from the HTML of a 4plebs thread page.
+    Returns None if the page has no thread article.
+    """
+    th = HTMLParser(html).css_first("article.clearfix.thread")
+    if th is None:
+        return None
+
+    def image_urls(node, selector):
+        srcs = [img.attributes.get("src") for img in node.css(selector)]
+        return fix_image_urls([urljoin(thread_url, src) for src in srcs if src])
+
+    op = {}
+    op["post_id"] = th.attributes.get("id")
+    op["post_url"] = thread_url # The input URL is the post URL
+
+    poster_hash = th.css_first("span.poster_hash")
+    op["author_id"] = node_text(poster_hash).replace("ID:", "").strip() if poster_hash else None
+    op["text"] = node_text(th.css_first("div.text"))
+
+    tm = th.css_first("time")
+    if tm is not None:
+        op["timestamp_raw"] = tm.text(strip=True)
+        op["timestamp_iso"] = tm.attributes.get("datetime")
+    else:
+        op["timestamp_raw"] = op["timestamp_iso"] = None
+
+    op["image_urls"] = image_urls(th, "img.thread_image, img.post_image")
+
+    reply_articles = th.css("aside.posts article")
+    op["reply_count"] = len(reply_articles)
+    op["replies"] = []
+    for ra in reply_articles:
+        r = {}
+        r["reply_id"] = ra.attributes.get("id")
+        r["reply_text"] = node_text(ra.css_first("div.text"))
+        rt = ra.css_first("time")
+        if rt is not None:
+            r["reply_timestamp_raw"] = rt.text(strip=True)
+            r["reply_timestamp_iso"] = rt.attributes.get("datetime")
+        else:
+            r["reply_timestamp_raw"] = r["reply_timestamp_iso"] = None
+        r["image_urls"] = image_urls(ra, "img.post_image")
+        op["replies"].append(r)
+
+    return op
+
+def get_thread_urls_from_archive_page(archive_url):
+    """
+    Extracts the URLs of individual threads from a 4plebs archive page.
+    Falls back to Selenium if the page is behind an anti-bot challenge.
+
+    Args:
+        archive_url (str): The URL of the 4plebs archive page (e.g., a timetravel page).
+
+    Returns:
+        list: A list of individual thread URLs found on the archive page.
+    """
+    try:
+        html = fetch_page_html(archive_url)
+        if html is None:
+            print(f"Challenge page returned for {archive_url}; falling back to Selenium.")
+            return run_with_pooled_driver(get_driver_pool(), get_thread_urls_with_selenium, archive_url)
+
+        thread_urls = parse_archive_page(html)
+        print(f"Collected {len(thread_urls)} thread URLs from {archive_url}")
+        return thread_urls
+
+    except Exception:
+        print(f"\n[!] An error occurred while getting thread URLs from {archive_url}. Returning empty data.")
+        traceback.print_exc()
+        return []
+
+def scrape_pol_thread(thread_url):
+    """
+    Scrapes all content of a single 4plebs thread, including the original post and
+    all replies. Falls back to Selenium if the page is behind an anti-bot challenge.
+
+    Args:
+        thread_url (str): The direct URL to a specific 4plebs thread.
+
+    Returns:
+        dict: A dictionary containing the scraped data for the thread,
+              or an empty dictionary if an error occurs.
+    """
+    try:
+        html = fetch_page_html(thread_url)
+        thread_data = parse_thread_page(html, thread_url) if html is not None else None
+        if thread_data is None:
+            print(f"No thread content in plain HTML for {thread_url}; falling back to Selenium.")
+            return run_with_pooled_driver(get_driver_pool(), scrape_pol_thread_with_selenium, thread_url)
+
+        print(f"Scraped thread: {thread_url} with {thread_data['reply_count']} replies.")
+        return thread_data
+
+    except Exception:
+        print(f"\n[!] An error occurred while scraping thread: {thread_url}. Returning empty data.")
+        traceback.print_exc()
+        return {}
 
 if __name__ == "__main__":
     # Define the base archive URL and the desired number of posts
@@ -180,13 +430,20 @@ if __name__ == "__main__":
     posts_per_page = 10 
     num_pages_to_scrape = (target_posts + posts_per_page - 1) // posts_per_page # Ceiling division
 
-    all_scraped_data = [] # Initialize here so it's accessible everywhere
+    # Each scraped thread is appended to the output as one JSON line as soon as it's done,
+    # so nothing is held in memory and a crash or interrupt loses no finished threads
+    output_filename = "pol_archive_all_threads_data.jsonl"
+    scraped_thread_urls = load_scraped_thread_urls(output_filename)
+    scraped_count = len(scraped_thread_urls)
+    if scraped_count:
+        print(f"Resuming: {scraped_count} threads already saved to {output_filename}")
+    output_file = open(output_filename, "ab")
 
     try:
         print(f"Starting to scrape {target_posts} posts across {num_pages_to_scrape} pages from {base_archive_url}")
 
         for page_num in range(1, num_pages_to_scrape + 1):
-            if len(all_scraped_data) >= target_posts:
+            if scraped_count >= target_posts:
                 print(f"Target of {target_posts} posts reached. Stopping.")
                 break
 
@@ -203,42 +460,42 @@ if __name__ == "__main__":
                 print(f"No thread URLs found on page {page_num}. Ending pagination.")
                 break
 
+            thread_urls_on_page = [url for url in thread_urls_on_page if url not in scraped_thread_urls]
             print(f"Step 2: Scraping data for {len(thread_urls_on_page)} threads from Page {page_num}...")
-            for i, thread_url in enumerate(thread_urls_on_page):
-                if len(all_scraped_data) >= target_posts:
-                    print(f"Target of {target_posts} posts reached during page {page_num} processing. Stopping.")
-                    break
-                
-                print(f"Processing thread {i+1}/{len(thread_urls_on_page)} on page {page_num}: {thread_url}")
-                data = scrape_pol_thread(thread_url)
-                if data:
-                    all_scraped_data.append(data)
-                else:
-                    print(f"Skipping empty data for thread: {thread_url}")
-                
-                # Optional: Add a small delay between individual thread scrapes to be polite
-                # time.sleep(0.5) 
+            # Threads on a page are independent, so scrape them concurrently (at most one
+            # pooled driver per worker if we fall back). executor.map yields results in page order.
+            with ThreadPoolExecutor(max_workers=DRIVER_POOL_SIZE) as executor:
+                results = executor.map(scrape_pol_thread, thread_urls_on_page)
+                for i, (thread_url, data) in enumerate(zip(thread_urls_on_page, results)):
+                    if scraped_count >= target_posts:
+                        print(f"Target of {target_posts} posts reached during page {page_num} processing. Stopping.")
+                        break
+
+                    print(f"Processed thread {i+1}/{len(thread_urls_on_page)} on page {page_num}: {thread_url}")
+                    if data:
+                        output_file.write(orjson.dumps(data) + b"\n")
+                        output_file.flush()
+                        scraped_thread_urls.add(thread_url)
+                        scraped_count += 1
+                    else:
+                        print(f"Skipping empty data for thread: {thread_url}")
 
     except KeyboardInterrupt:
-        print("\n[!] Keyboard interrupt detected. The data will be saved in the finally block.")
+        print("\n[!] Keyboard interrupt detected. Threads scraped so far are already saved.")
         # Re-raise the KeyboardInterrupt so the program terminates after finally
         raise 
     except Exception:
         error_trace = traceback.format_exc()
         print(f"\n[!] A non-KeyboardInterrupt error occurred. Traceback:\n{error_trace}")
-        # The finally block will still handle the saving
         
     finally:
-        # This block will always execute, ensuring data saving on normal exit or interrupt
-        if all_scraped_data:
-            output_filename = "pol_archive_all_threads_data.json"
-            # Ensure we only save up to target_posts if more were accidentally collected
-            final_data_to_save = all_scraped_data[:target_posts] 
-            try:
-                with open(output_filename, "w") as f:
-                    json.dump(final_data_to_save, f, indent=2)
-                print(f"\nSuccessfully saved partial/final data for {len(final_data_to_save)} threads to {output_filename}")
-            except Exception as save_err:
-                print(f"\n[!] Error saving data in finally block: {save_err}")
+        if _driver_pool is not None:
+            close_driver_pool(_driver_pool)
+        if _chrome_service is not None:
+            _chrome_service.stop()
+        output_file.close()
+
+        if scraped_count:
+            print(f"\n{scraped_count} threads saved to {output_filename}")
         else:
-            print("\nNo thread data was collected to save.")
\ No newline at end of file
+            print("\nNo thread data was collected to save.")
@@ -1,5 +1,9 @@
+import os
+# webdriver_manager: keep downloaded drivers in ./.wdm and don't log every cache probe
+os.environ.setdefault("WDM_LOCAL", "1")
+os.environ.setdefault("WDM_LOG_LEVEL", "0")
 import sys
-import time
+import functools
 from datetime import datetime, timezone, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -9,9 +13,12 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-import json
+import orjson
 from urllib.parse import urljoin
 import re
+import lxml.html
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
 
 # -- Configuration --
 POSTS_TO_SCRAPE = 1000 # Keep this low for testing, user can adjust. Script will continue until this many *valid* posts are found.
@@ -19,23 +26,123 @@ SCROLL_PAUSE_TIME = 2
 MAX_SCROLLS = 500 # Increased max scrolls to allow deeper search for old posts
 MIN_POST_AGE_DAYS = 0 # Post must be at least 14 days old
 MIN_REPLIES_REQUIRED = 0 # Post must have at least 20 replies
-
-# Custom Expected Condition to handle multiple possible conditions
-class any_of_conditions:
-    def __init__(self, *conditions):
-        self.conditions = conditions
-
-    def __call__(self, driver):
-        for condition in self.conditions:
-            try:
-                result = condition(driver)
-                if result:
-                    return result
-            except Exception: # Catch any exception, including NoSuchElementException, to let other conditions run
-                pass
-        return False
+SCRAPER_WORKERS = 4 # Chrome instances scraping posts in parallel, one per worker process
+LOGIN_PROFILE_DIR = os.path.abspath("gab_profile") # Chrome profile the login is kept in between runs
+LOGIN_TIMEOUT = 180 # Seconds to wait for the manual login to complete
+# Analytics/ad hosts blocked in the scraping browsers; they only delay the page load event
+BLOCKED_TRACKER_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*segment.io*",
+    "*sentry.io*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+]
+
+# -- Precompiled patterns (used for every post and reply) --
+COUNT_SUFFIX_MULTIPLIERS = {
+    'K': 1_000, 'k': 1_000,
+    'M': 1_000_000, 'm': 1_000_000,
+    'B': 1_000_000_000, 'b': 1_000_000_000,
+    'T': 1_000_000_000_000,
+}
+COUNT_RE = re.compile(r'\d[\d,.]*\s*[KMBTkmb]?')
+TZ_PAREN_RE = re.compile(r'\s*\([^)]+\)')
+AUTHOR_RE = re.compile(r'gab.com/([^/]+)/posts/')
+LONG_WORD_RE = re.compile(r'[a-zA-Z]{5,}')
+# Also run in the browser (as a JS RegExp) by the extraction scripts below
+IMG_SRC_RE = re.compile(r'src="(https?://m3\.gab\.com/media_attachments/[^"]+\.(?:jpg|jpeg|png|gif|webp)[^"]*)"')
+DIGITS_RE = re.compile(r'\d+')
+REPOSTS_RE = re.compile(r'(\d[\d,.]*[KMBTkmb]?)\s*Reposts', re.IGNORECASE)
+QUOTES_RE = re.compile(r'(\d[\d,.]*[KMBTkmb]?)\s*Quotes', re.IGNORECASE)
+REPLIES_RE = re.compile(r'(\d[\d,.]*[KMBTkmb]?)\s*Replies', re.IGNORECASE)
+VIEWS_RE = re.compile(r'(\d[\d,.]*[KMBTkmb]?)\s*views', re.IGNORECASE)
+
+# -- XPath queries run against the parsed post page --
+REACTIONS_SPAN_XPATH = '//span[normalize-space(@class)="_3u7ZG _UuSG _3_54N a8-QN _2cSLK L4pn5 RiX17"]'
+VIEWS_BUTTON_XPATH = '//button/@title | //button/@aria-label'
+# Elements with a direct text node mentioning the (lowercase) word; case-insensitive via translate().
+# Relative, so it only searches under the element it's run on
+WORD_ELEMENTS_XPATH = './/*[text()[contains(translate(., "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), $word)]]'
+
+# Where to look for the post body, tried in order (relative to the main post element)
+POST_TEXT_XPATHS = [
+    './/div[contains(@class, "post-content")]//span[@data-text-content]',
+    './/div[contains(@class, "post-content")]//div[@data-text-content]',
+    './/div[contains(@class, "post-content")]//p',
+    './/div[contains(@class, "post-content-body")]',
+    './/div[contains(@class, "break-words") and not(contains(@class, "post-header")) and not(contains(@class, "flex")) and not(contains(@class, "text-sm"))]',
+    './/div[contains(@class, "post-content")]',
+    './/p[string-length(normalize-space(.)) > 10 and not(ancestor::div[contains(@class, "post-header")])]',
+    './/div[not(contains(@class, "hidden")) and string-length(normalize-space(.)) > 10 and not(contains(@class, "meta")) and not(contains(@class, "header")) and not(contains(@class, "text-gray"))]',
+    './/div[contains(@class, "post-description")]',
+]
+# Where to look for the post timestamp, tried in order
+POST_TIMESTAMP_XPATHS = [
+    './/time',
+    './/div[contains(@class, "post-meta")]//time',
+    './/a[contains(@href, "/posts/") and contains(@href, "/posts/")]//time',
+    './/span[contains(@class, "timestamp")]',
+]
+
+# Reply containers; the second (class-based) form is kept in the union in case the
+# data-comment markup changes. `|` returns each node once, in document order.
+REPLY_ELEMENTS_XPATH = (
+    '//div[starts-with(@data-comment, "")]'
+    ' | //div[contains(@class, "_2hI-g") and contains(@class, "_3d6X0") and contains(@class, "_1qZTN") and contains(@class, "_36P3U") and starts-with(@data-comment, "")]'
+)
+
+# Extracts every reply matching the XPath in arguments[0] in one WebDriver call, instead
+# of a WebDriverWait/get_attribute round-trip per field per reply. Missing fields are null.
+# arguments[1] is IMG_SRC_RE.pattern, so image URLs come back instead of each reply's HTML.
+EXTRACT_REPLIES_JS = """
+const result = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const imgRe = new RegExp(arguments[1], "g");
+const first = (xp, node) => document.evaluate(xp, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const replies = [];
+for (let i = 0; i < result.snapshotLength; i++) {
+  const node = result.snapshotItem(i);
+  const textElem = first('.//div[@tabindex="0"]/p', node);
+  const timeElem = first('.//a[contains(@href, "/posts/")]/span/time', node);
+  replies.push({
+    id: node.getAttribute("data-comment"),
+    text: textElem ? textElem.innerText : null,
+    datetime: timeElem ? timeElem.getAttribute("datetime") : null,
+    age_text: timeElem ? timeElem.innerText : null,
+    image_urls: [...new Set(Array.from(node.outerHTML.matchAll(imgRe), m => m[1]))],
+  });
+}
+return replies;
+"""
+
+# Reads everything get_post_details needs from the main post in one WebDriver call
+# instead of a find_element/get_attribute round-trip per field.
+# Arguments: post id, POST_TEXT_XPATHS, POST_TIMESTAMP_XPATHS, IMG_SRC_RE.pattern.
+EXTRACT_POST_JS = """
+const [postId, textXpaths, timestampXpaths, imgPattern] = arguments;
+const post = document.querySelector(`div[data-id='${postId}']`);
+if (!post) return null;
+const first = (xpaths) => {
+  for (const xp of xpaths) {
+    const node = document.evaluate(xp, post, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (node) return node;
+  }
+  return null;
+};
+const textElem = first(textXpaths);
+const timeElem = first(timestampXpaths);
+return {
+  text: textElem ? textElem.innerText : null,
+  image_urls: [...new Set(Array.from(post.outerHTML.matchAll(new RegExp(imgPattern, "g")), m => m[1]))],
+  timestamp_datetime: timeElem ? timeElem.getAttribute("datetime") : null,
+  timestamp_text: timeElem ? timeElem.innerText : null,
+  page_html: document.documentElement.outerHTML,
+};
+"""
 
 # Helper function to extract numerical count from a string
+# Memoized: the same short count strings ("1.2K", "345") come up over and over
+@functools.lru_cache(maxsize=4096)
 def extract_count_from_string(text_to_parse):
     """
     Extracts a numerical count from a string.
@@ -47,26 +154,22 @@ def extract_count_from_string(text_to_parse):
     try:
         # Regex to find numbers, potentially with commas or decimals, and optional K/M/B/T suffix
         # Added \s* to handle potential spaces around the number before K/M/B/T
-        match = re.search(r'(\d[\d,.]*\s*[KMBTkmb]?)', text_to_parse)
+        match = COUNT_RE.search(text_to_parse)
         if match:
-            num_str = match.group(1).replace(',', '').strip()
+            num_str = match.group(0).replace(',', '').strip()
             
             # Handle K, M, B, T suffixes
-            if 'K' in num_str.upper():
-                return int(float(num_str.replace('K', '')) * 1000)
-            elif 'M' in num_str.upper():
-                return int(float(num_str.replace('M', '')) * 1000000)
-            elif 'B' in num_str.upper():
-                return int(float(num_str.replace('B', '')) * 1000000000)
-            elif 'T' in num_str.upper():
-                return int(float(num_str.replace('T', '')) * 1000000000000)
-            else:
-                return int(float(num_str))
+            multiplier = COUNT_SUFFIX_MULTIPLIERS.get(num_str[-1])
+            if multiplier:
+                return int(float(num_str[:-1]) * multiplier)
+            return int(float(num_str))
     except (ValueError, AttributeError):
         pass
     return 0
 
 # Helper function to parse Gab's specific datetime format
+# Memoized since strptime is slow and replies often share a timestamp
+@functools.lru_cache(maxsize=4096)
 def parse_gab_datetime(dt_string):
     """
     Parses a datetime string from Gab (e.g., "Mon Jul 07 2025 07:59:42 GMT-0700 (Pacific Daylight Time)")
@@ -76,7 +179,7 @@ def parse_gab_datetime(dt_string):
         return None # Return None if string is empty
     
     # Remove the parenthesized timezone part, e.g., "(Pacific Daylight Time)"
-    clean_dt_string = re.sub(r'\s*\([^)]+\)', '', dt_string).strip()
+    clean_dt_string = TZ_PAREN_RE.sub('', dt_string).strip()
     try:
         # Format string: "%a %b %d %Y %H:%M:%S GMT%z"
         # Example: "Mon Jul 07 2025 07:59:42 GMT-0700"
@@ -86,13 +189,42 @@ def parse_gab_datetime(dt_string):
         return None # Return None on parse error
 
 
+# Helper function to find an interaction count (e.g. "1.2K Reposts") in a parsed page
+def find_count_near_word(tree, word, pattern):
+    """
+    Returns the first count matching `pattern` next to `word` in the text under `tree`, or 0.
+    Checks each element whose own text mentions `word`, then its parent, so counts
+    split across tags like `1.2K <span>views</span>` are still found.
+    """
+    for elem in tree.xpath(WORD_ELEMENTS_XPATH, word=word):
+        for candidate in (elem, elem.getparent()):
+            if candidate is None:
+                continue
+            match = pattern.search(candidate.text_content())
+            if match:
+                return extract_count_from_string(match.group(1))
+    return 0
+
+def wait_for_height_change(driver, height_script, last_height, timeout, *script_args):
+    """
+    Polls `height_script` until it reports something other than `last_height`, for at most
+    `timeout` seconds. Returns the latest height, so a fast load doesn't wait out the timeout.
+    """
+    def height_changed(d):
+        height = d.execute_script(height_script, *script_args)
+        return height if height != last_height else False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.2).until(height_changed)
+    except TimeoutException:
+        return last_height
+
 def scroll_to_end(driver, scroll_pause_time=SCROLL_PAUSE_TIME):
     """Scrolls down the page to load more content, for infinite scrolling feeds."""
     print(f"Initiating scroll sequence to load more content...")
     last_height = driver.execute_script("return document.body.scrollHeight")
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(scroll_pause_time)
-    new_height = driver.execute_script("return document.body.scrollHeight")
+    new_height = wait_for_height_change(driver, "return document.body.scrollHeight", last_height, scroll_pause_time)
     if new_height == last_height:
         print(f"  Reached end of scrollable content or no new content loaded.")
         return False # Indicate no new content was loaded
@@ -112,8 +244,7 @@ def scroll_element_to_end(driver, element_xpath, scroll_pause_time=1, max_scroll
         scroll_count = 0
         while scroll_count < max_scrolls:
             driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-            time.sleep(scroll_pause_time)
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_container)
+            new_height = wait_for_height_change(driver, "return arguments[0].scrollHeight", last_height, scroll_pause_time, scroll_container)
             if new_height == last_height:
                 print(f"    Reached end of scrollable element or no new content after {scroll_count + 1} scrolls.")
                 break
@@ -134,11 +265,10 @@ def get_post_details(post_url, driver):
     print(f"\n  Navigating to post detail page: {post_url}")
     try:
         driver.get(post_url)
-        time.sleep(3) # Increased initial wait for full page render
 
         post_id = post_url.split('/')[-1].split('?')[0].split('#')[0]
 
-        # Explicitly wait for the main post element to be present.
+        # Explicitly wait for the main post element to be present; this is the page's readiness signal.
         WebDriverWait(driver, 25).until( 
             EC.presence_of_element_located((By.CSS_SELECTOR, f"div[data-id='{post_id}']"))
         )
@@ -154,16 +284,58 @@ def get_post_details(post_url, driver):
         return None
 
     post_data = {"post_id": post_id, "post_url": post_url, "image_urls": [], "replies": []}
-    main_post_element = None
 
     try:
-        main_post_element = driver.find_element(By.CSS_SELECTOR, f"div[data-id='{post_id}']")
+        # Pull text, image URLs and timestamp for the main post, plus the page HTML, in one call.
+        # The <time> can render a moment after the container, so poll until it's there.
+        def read_post_fields(d):
+            return d.execute_script(EXTRACT_POST_JS, post_id, POST_TEXT_XPATHS, POST_TIMESTAMP_XPATHS, IMG_SRC_RE.pattern)
+
+        def post_fields_with_timestamp(d):
+            fields = read_post_fields(d)
+            return fields if fields and (fields["timestamp_datetime"] or (fields["timestamp_text"] or "").strip()) else False
+
+        try:
+            post_fields = WebDriverWait(driver, 10, poll_frequency=0.2).until(post_fields_with_timestamp)
+        except TimeoutException:
+            # Still no timestamp; take what's there and let the checks below reject it
+            post_fields = read_post_fields(driver)
+        if post_fields is None:
+            raise NoSuchElementException(f"div[data-id='{post_id}'] disappeared before scraping")
         print("  Main post element successfully located for scraping.")
 
+        # Timestamp and age filter first, so posts that are too new are rejected before any other work
+        print("    Attempting to scrape timestamp and apply age filter...")
+        raw_timestamp = post_fields["timestamp_datetime"] or (post_fields["timestamp_text"] or "").strip()
+        if not raw_timestamp:
+            print("    Warning: Timestamp not found for main post. Cannot apply age filter. Skipping post.")
+            return None
+        post_data["timestamp"] = raw_timestamp
+        post_data["timestamp_iso"] = parse_gab_datetime(raw_timestamp)
+        print(f"    Timestamp: {post_data['timestamp']}")
+        print(f"    Timestamp ISO: {post_data['timestamp_iso']}")
+
+        # Age filter check
+        if post_data["timestamp_iso"]:
+            post_datetime = datetime.fromisoformat(post_data["timestamp_iso"])
+            # Ensure comparison is timezone-aware
+            if post_datetime.tzinfo is None:
+                post_datetime = post_datetime.replace(tzinfo=timezone.utc)
+            
+            current_datetime_utc = datetime.now(timezone.utc)
+            age_difference = current_datetime_utc - post_datetime
+
+            if age_difference.days < MIN_POST_AGE_DAYS:
+                print(f"    Post is only {age_difference.days} days old, which is less than {MIN_POST_AGE_DAYS} days. Skipping post.")
+                return None
+        else:
+            print("    Warning: Could not parse post timestamp. Cannot apply age filter. Skipping post to be safe.")
+            return None
+
         # Scrape author username from URL
         try:
             print("    Attempting to scrape author username from URL...")
-            match = re.search(r'gab.com/([^/]+)/posts/', post_url)
+            match = AUTHOR_RE.search(post_url)
             if match:
                 post_data["author_username"] = "@" + match.group(1)
             else:
@@ -174,26 +346,16 @@ def get_post_details(post_url, driver):
             post_data["author_username"] = "Error (URL parse failed)"
 
 
-        # Scrape post text (Revised for robustness against picking up header info)
-        try:
-            print("    Attempting to scrape post text...")
-            text_element = WebDriverWait(main_post_element, 10).until(
-                any_of_conditions(
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]//span[@data-text-content]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]//div[@data-text-content]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]//p')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content-body")]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "break-words") and not(contains(@class, "post-header")) and not(contains(@class, "flex")) and not(contains(@class, "text-sm"))]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]')), 
-                    EC.presence_of_element_located((By.XPATH, './/p[string-length(normalize-space(.)) > 10 and not(ancestor::div[contains(@class, "post-header")])]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[not(contains(@class, "hidden")) and string-length(normalize-space(.)) > 10 and not(contains(@class, "meta")) and not(contains(@class, "header")) and not(contains(@class, "text-gray"))]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-description")]'))
-                )
-            )
-            raw_text = text_element.text.strip()
+        # Post text (Revised for robustness against picking up header info)
+        print("    Attempting to scrape post text...")
+        if post_fields["text"] is None:
+            post_data["text"] = "No primary text content found."
+            print("    Warning: Post text content not found.")
+        else:
+            raw_text = post_fields["text"].strip()
             
             is_likely_header = False
-            if len(raw_text) < 30 and (("·" in raw_text or "\n" in raw_text) and not re.search(r'[a-zA-Z]{5,}', raw_text)): 
+            if len(raw_text) < 30 and (("·" in raw_text or "\n" in raw_text) and not LONG_WORD_RE.search(raw_text)): 
                 is_likely_header = True
             if raw_text.startswith(post_data["author_username"]) and len(raw_text) < 50:
                  is_likely_header = True
@@ -209,123 +371,53 @@ def get_post_details(post_url, driver):
             else:
                 print(f"    Post text: {post_data['text']}")
 
-        except TimeoutException:
-            post_data["text"] = "No primary text content found (timed out)."
-            print("    Warning: Post text content element timed out.")
-        except NoSuchElementException:
-            post_data["text"] = "No primary text content found."
-            print("    Warning: Post text content not found.")
-        except Exception as e:
-            print(f"    Error scraping post text: {e}")
-            post_data["text"] = "Error retrieving text."
 
+        # Image URLs, matched against the main post element's outerHTML in the browser
+        print("    Attempting to scrape image URLs from main post element's HTML...")
+        post_data["image_urls"] = post_fields["image_urls"]
+        print(f"    Found {len(post_data['image_urls'])} image URLs.")
 
-        # Scrape image URLs using regex on the main_post_element's outerHTML
-        try:
-            print("    Attempting to scrape image URLs from main post element's HTML...")
-            main_post_html = main_post_element.get_attribute('outerHTML')
-            image_urls = []
-            img_src_pattern = re.compile(r'src="(https?://m3\.gab\.com/media_attachments/[^"]+\.(?:jpg|jpeg|png|gif|webp)[^"]*)"')
-            
-            for match in img_src_pattern.finditer(main_post_html):
-                image_urls.append(match.group(1))
-            
-            post_data["image_urls"] = list(set(image_urls))
-            print(f"    Found {len(post_data['image_urls'])} image URLs.")
-        except Exception as e:
-            post_data["image_urls"] = []
-            print(f"    Error scraping image URLs from main post element: {e}")
-
-
-        # Scrape timestamp and apply age filter
-        try:
-            print("    Attempting to scrape timestamp and apply age filter...")
-            timestamp_elem = WebDriverWait(main_post_element, 10).until(
-                any_of_conditions(
-                    EC.presence_of_element_located((By.TAG_NAME, 'time')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-meta")]//time')),
-                    EC.presence_of_element_located((By.XPATH, './/a[contains(@href, "/posts/") and contains(@href, "/posts/")]//time')),
-                    EC.presence_of_element_located((By.XPATH, './/span[contains(@class, "timestamp")]'))
-                )
-            )
-            raw_timestamp = timestamp_elem.get_attribute('datetime') or timestamp_elem.text.strip()
-            post_data["timestamp"] = raw_timestamp
-            post_data["timestamp_iso"] = parse_gab_datetime(raw_timestamp)
-            print(f"    Timestamp: {post_data['timestamp']}")
-            print(f"    Timestamp ISO: {post_data['timestamp_iso']}")
-
-            # Age filter check
-            if post_data["timestamp_iso"]:
-                post_datetime = datetime.fromisoformat(post_data["timestamp_iso"])
-                # Ensure comparison is timezone-aware
-                if post_datetime.tzinfo is None:
-                    post_datetime = post_datetime.replace(tzinfo=timezone.utc)
-                
-                current_datetime_utc = datetime.now(timezone.utc)
-                age_difference = current_datetime_utc - post_datetime
-
-                if age_difference.days < MIN_POST_AGE_DAYS:
-                    print(f"    Post is only {age_difference.days} days old, which is less than {MIN_POST_AGE_DAYS} days. Skipping post.")
-                    return None
-            else:
-                print("    Warning: Could not parse post timestamp. Cannot apply age filter. Skipping post to be safe.")
-                return None
-
-        except TimeoutException:
-            post_data["timestamp"] = "N/A (Timeout)"
-            post_data["timestamp_iso"] = "N/A"
-            print("    Warning: Timestamp element timed out. Cannot apply age filter. Skipping post.")
-            return None
-        except NoSuchElementException:
-            post_data["timestamp"] = "N/A"
-            post_data["timestamp_iso"] = "N/A"
-            print("    Warning: Timestamp not found for main post. Cannot apply age filter. Skipping post.")
-            return None
-        except Exception as e:
-            print(f"    Error scraping timestamp or applying age filter: {e}. Skipping post.")
-            post_data["timestamp"] = "Error"
-            post_data["timestamp_iso"] = "Error"
-            return None
 
-        # Scrape reactions, reposts, quotes, and views from the entire page source using regex
+        # Scrape reactions, reposts, quotes, and views from one parse of the page HTML
         print("    Attempting to scrape interactions (reactions, reposts, quotes, views) from page source...")
-        page_source = driver.page_source
+        tree = lxml.html.fromstring(post_fields["page_html"])
         
-        # Reactions (formerly 'likes')
-        reactions_match = re.search(r'<span\s+class="_3u7ZG\s+_UuSG\s+_3_54N\s+a8-QN\s+_2cSLK\s+L4pn5\s+RiX17"\s+data-text="(\d+)"[^>]*>', page_source)
-        if reactions_match:
-            post_data["likes"] = extract_count_from_string(reactions_match.group(1))
-        else:
-            reactions_text_match = re.search(r'<span\s+class="_3u7ZG\s+_UuSG\s+_3_54N\s+a8-QN\s+_2cSLK\s+L4pn5\s+RiX17"[^>]*>(\d+)\s*</span>', page_source)
-            if reactions_text_match:
-                post_data["likes"] = extract_count_from_string(reactions_text_match.group(1))
-            else:
-                post_data["likes"] = 0
+        # Reactions (formerly 'likes'): the count is in data-text, or failing that the span's text
+        post_data["likes"] = 0
+        for span in tree.xpath(REACTIONS_SPAN_XPATH):
+            reactions_text = span.get("data-text") or span.text_content().strip()
+            if DIGITS_RE.fullmatch(reactions_text):
+                post_data["likes"] = extract_count_from_string(reactions_text)
+                break
         print(f"    Reactions (Likes): {post_data['likes']}")
 
         # Reposts
-        reposts_match = re.search(r'(\d[\d,.]*[KMBTkmb]?)\s*Reposts', page_source, re.IGNORECASE)
-        post_data["reposts_count"] = extract_count_from_string(reposts_match.group(1)) if reposts_match else 0
+        post_data["reposts_count"] = find_count_near_word(tree, "reposts", REPOSTS_RE)
         print(f"    Reposts: {post_data['reposts_count']}")
 
         # Quotes
-        quotes_match = re.search(r'(\d[\d,.]*[KMBTkmb]?)\s*Quotes', page_source, re.IGNORECASE)
-        post_data["quotes_count"] = extract_count_from_string(quotes_match.group(1)) if quotes_match else 0
+        post_data["quotes_count"] = find_count_near_word(tree, "quotes", QUOTES_RE)
         print(f"    Quotes: {post_data['quotes_count']}")
 
-        # Views
-        views_button_match = re.search(r'<button[^>]*\s(?:title|aria-label)="(\d[\d,.]*[KMBTkmb]?)\s*views"[^>]*>', page_source, re.IGNORECASE)
-        if views_button_match:
-            post_data["views"] = extract_count_from_string(views_button_match.group(1))
+        # Views: prefer the views button's title/aria-label, then any "N views" text
+        views_labels = [label for label in tree.xpath(VIEWS_BUTTON_XPATH) if VIEWS_RE.fullmatch(label.strip())]
+        if views_labels:
+            post_data["views"] = extract_count_from_string(views_labels[0])
         else:
-            views_span_match = re.search(r'([\d,.]*[KMBTkmb]?)\s*<span[^>]*>views</span>', page_source, re.IGNORECASE)
-            if views_span_match:
-                post_data["views"] = extract_count_from_string(views_span_match.group(1))
-            else:
-                views_text_match = re.search(r'(\d[\d,.]*[KMBTkmb]?)\s*views', page_source, re.IGNORECASE)
-                post_data["views"] = extract_count_from_string(views_text_match.group(1)) if views_text_match else 0
+            post_data["views"] = find_count_near_word(tree, "views", VIEWS_RE)
         print(f"    Views: {post_data['views']}")
 
+        # Reply count filter, using the count shown on the page so rejected posts skip the
+        # reply scroll/scrape below. 0 means the page didn't show one; those are checked after.
+        # Only the main post's own container is searched: elsewhere on the page, "N replies"
+        # can be a nested reply's "View 2 replies" link.
+        if MIN_REPLIES_REQUIRED > 0:
+            main_post_elems = tree.xpath('//div[@data-id=$post_id]', post_id=post_id)
+            shown_reply_count = find_count_near_word(main_post_elems[0], "replies", REPLIES_RE) if main_post_elems else 0
+            if 0 < shown_reply_count < MIN_REPLIES_REQUIRED:
+                print(f"  Post only shows {shown_reply_count} replies, which is less than the required {MIN_REPLIES_REQUIRED}. Skipping post.")
+                return None
+
 
     except TimeoutException as e:
         print(f"  Timeout waiting for a critical sub-element of the main post. Error: {e}. Skipping post.")
@@ -366,95 +458,51 @@ def get_post_details(post_url, driver):
     
     if not scrolled_comments:
         print("  Could not find or scroll a dedicated comments container. Proceeding with visible replies.")
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        scroll_to_end(driver, scroll_pause_time=2)
 
 
     try:
-        time.sleep(2) 
-
-        reply_element_xpaths = [
-            '//div[starts-with(@data-comment, "")]',
-            '//div[contains(@class, "_2hI-g") and contains(@class, "_3d6X0") and contains(@class, "_1qZTN") and contains(@class, "_36P3U") and starts-with(@data-comment, "")]'
-        ]
-
+        # Polls until the first reply is rendered rather than sleeping a fixed time
         WebDriverWait(driver, 15).until(
-            any_of_conditions(*[EC.presence_of_element_located((By.XPATH, xp)) for xp in reply_element_xpaths])
+            EC.presence_of_element_located((By.XPATH, REPLY_ELEMENTS_XPATH))
         )
-        
-        all_reply_elements = []
-        for xp in reply_element_xpaths:
-            all_reply_elements.extend(driver.find_elements(By.XPATH, xp))
-        
-        unique_reply_elements = []
-        seen_identifiers = set()
 
-        for elem in all_reply_elements:
-            try:
-                elem_identifier = elem.get_attribute('data-comment')
-                if elem_identifier and elem_identifier not in seen_identifiers:
-                    unique_reply_elements.append(elem)
-                    seen_identifiers.add(elem_identifier)
-            except StaleElementReferenceException:
-                print("  Stale element encountered during reply collection, skipping.")
-                continue 
+        # One call returns every reply's fields; the XPath union already dedupes nodes,
+        # and replies sharing a data-comment id are deduped here
+        unique_replies = []
+        seen_identifiers = set()
+        for reply in driver.execute_script(EXTRACT_REPLIES_JS, REPLY_ELEMENTS_XPATH, IMG_SRC_RE.pattern):
+            if reply["id"] and reply["id"] not in seen_identifiers:
+                unique_replies.append(reply)
+                seen_identifiers.add(reply["id"])
 
-        print(f"  Found {len(unique_reply_elements)} unique reply elements for detailed scraping.")
+        print(f"  Found {len(unique_replies)} unique reply elements for detailed scraping.")
 
-        for i, reply_elem in enumerate(unique_reply_elements):
+        for i, reply in enumerate(unique_replies):
             reply_info = {}
-            reply_info["reply_id"] = reply_elem.get_attribute('data-comment') or f"reply_{i}_{datetime.now().timestamp()}"
+            reply_info["reply_id"] = reply["id"]
 
-            # Scrape Reply Text
-            reply_text = "No text found."
-            try:
-                text_elem = WebDriverWait(reply_elem, 3).until( 
-                    EC.presence_of_element_located((By.XPATH, './/div[@tabindex="0"]/p'))
-                )
-                raw_reply_text = text_elem.text.strip()
-                if len(raw_reply_text) > 0:
-                    reply_text = raw_reply_text
-                else:
-                    reply_text = "No substantive text found."
-
-            except (TimeoutException, NoSuchElementException):
-                reply_text = "No text found (Timeout/Not Found)."
-            except Exception as e:
-                print(f"      Error retrieving reply {i} text: {e}")
-                reply_text = "Error retrieving text."
-            reply_info["reply_text"] = reply_text
-
-            # Scrape Reply Timestamp
-            reply_info["reply_timestamp_raw"] = "N/A"
-            reply_info["reply_age_text"] = "N/A"
-            reply_info["reply_timestamp_iso"] = "N/A"
-            try:
-                timestamp_elem = WebDriverWait(reply_elem, 3).until( 
-                    EC.presence_of_element_located((By.XPATH, './/a[contains(@href, "/posts/")]/span/time'))
-                )
-                reply_info["reply_timestamp_raw"] = timestamp_elem.get_attribute('datetime')
-                reply_info["reply_age_text"] = timestamp_elem.text.strip()
-                
-                reply_info["reply_timestamp_iso"] = parse_gab_datetime(reply_info["reply_timestamp_raw"])
-
-            except (TimeoutException, NoSuchElementException):
-                print(f"      Warning: Reply {i} timestamp element timed out or not found.")
-            except Exception as e:
-                print(f"      Error scraping reply {i} timestamp: {e}")
+            # Reply Text
+            if reply["text"] is None:
+                reply_info["reply_text"] = "No text found (Timeout/Not Found)."
+            else:
+                reply_info["reply_text"] = reply["text"].strip() or "No substantive text found."
+
+            # Reply Timestamp
+            if reply["datetime"] is None and reply["age_text"] is None:
+                print(f"      Warning: Reply {i} timestamp element not found.")
+                reply_info["reply_timestamp_raw"] = "N/A"
+                reply_info["reply_age_text"] = "N/A"
+                reply_info["reply_timestamp_iso"] = "N/A"
+            else:
+                reply_info["reply_timestamp_raw"] = reply["datetime"]
+                reply_info["reply_age_text"] = reply["age_text"].strip()
+                reply_info["reply_timestamp_iso"] = parse_gab_datetime(reply["datetime"])
             
-            # Add: Scrape Image URLs for replies
-            reply_info["image_urls"] = []
-            try:
-                reply_html = reply_elem.get_attribute('outerHTML')
-                img_src_pattern = re.compile(r'src="(https?://m3\.gab\.com/media_attachments/[^"]+\.(?:jpg|jpeg|png|gif|webp)[^"]*)"')
-                
-                for match in img_src_pattern.finditer(reply_html):
-                    reply_info["image_urls"].append(match.group(1))
-                reply_info["image_urls"] = list(set(reply_info["image_urls"])) # Remove duplicates
-                if reply_info["image_urls"]:
-                    print(f"      Found {len(reply_info['image_urls'])} image URLs for reply {i+1}.")
-            except Exception as e:
-                print(f"      Error scraping image URLs for reply {i}: {e}")
+            # Image URLs for replies
+            reply_info["image_urls"] = reply["image_urls"]
+            if reply_info["image_urls"]:
+                print(f"      Found {len(reply_info['image_urls'])} image URLs for reply {i+1}.")
 
             post_data["replies"].append(reply_info)
             print(f"    Scraped Reply {i+1}: Text='{reply_info['reply_text'][:50]}...', Age='{reply_info['reply_age_text']}', Image URLs={len(reply_info['image_urls'])}")
@@ -474,115 +522,151 @@ def get_post_details(post_url, driver):
     return post_data
 
 
-def main():
-    dataset = []  # ← always in scope
-    dump_filename = None
-
-
-    """Main function to orchestrate the scraping process from a predefined list of URLs."""
-    print("Initializing WebDriver...")
+def make_chrome_options(headless=False, profile_dir=None):
+    """
+    Chrome options shared by the login browser and every scraping worker. Workers run
+    headless; the login browser is visible and keeps its session in `profile_dir`.
+    """
     chrome_options = Options()
+    if headless:
+        # Nothing is painted or composited, which makes each page render cheaper
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    prefs = {"profile.default_content_setting_values.cookies": 1} # Keep cookies so the manual login sticks
+    if headless:
+        # Workers don't download images or web fonts: image URLs are read from the HTML, never
+        # rendered. The login browser loads everything so captchas and the sign-in form work.
+        # Stylesheets stay on because the comment containers only scroll with their CSS applied.
+        prefs["profile.managed_default_content_settings.images"] = 2
+        prefs["profile.managed_default_content_settings.fonts"] = 2
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        # driver.get returns at DOMContentLoaded instead of waiting for every subresource;
+        # get_post_details waits for the post element itself anyway
+        chrome_options.page_load_strategy = "eager"
+    chrome_options.add_experimental_option("prefs", prefs)
+    return chrome_options
+
+# Each worker process keeps one logged-in Chrome and reuses it for all of its URLs
+worker_driver = None
+
+def init_worker(chromedriver_path, login_cookies):
+    """ProcessPoolExecutor initializer: starts this worker's Chrome and copies in the login session."""
+    global worker_driver
+    worker_driver = webdriver.Chrome(service=ChromeService(executable_path=chromedriver_path), options=make_chrome_options(headless=True))
+    worker_driver.execute_cdp_cmd("Network.enable", {})
+    worker_driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_TRACKER_URLS})
+    # Cookies can only be set for the domain currently loaded
+    worker_driver.get("https://gab.com/")
+    for cookie in login_cookies:
+        try:
+            worker_driver.add_cookie(cookie)
+        except WebDriverException as e:
+            print(f"  Could not copy cookie {cookie.get('name')} to worker: {e.msg if e.msg else str(e)}")
+    # Pool workers exit without running atexit, but multiprocessing finalizers still run
+    Finalize(worker_driver, worker_driver.quit, exitpriority=10)
+
+def scrape_one(url):
+    """Scrapes one post URL in this worker's Chrome. Returns the post details or None."""
+    print(f"\n--- Attempting to scrape: {url} ---")
+    # get_post_details navigates the worker's single tab straight to the post
+    return get_post_details(url, worker_driver)
 
-    service = ChromeService(executable_path=ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-
-    try:
-        # === MANUAL LOGIN STEP ===
-        print("\n" + "="*60)
-        print("ACTION REQUIRED: Please log in to your Gab account in the browser window.")
-        print("The script will wait for 90 seconds to allow you to complete the login.")
-        print("DO NOT close the browser window.")
-        print("="*60 + "\n")
-        driver.get("https://gab.com/auth/sign_in")
-        time.sleep(90) # Give ample time for manual login
+def main():
+    scraped_count = 0  # ← always in scope
+    executor = None
+    # Each post is written as one JSON line as soon as it's scraped, so an interrupt or
+    # crash keeps everything collected so far
+    output_filename = f"gab_data_from_list_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.jsonl"
 
-        # Define your list of Gab post URLs here
-        with open("gab_urls_4.json", "r", encoding="utf-8") as f:
-            gab_urls = json.load(f)
-        
-        # Store the handle of the initial (main) window
-        main_window_handle = driver.current_window_handle
 
-        for url in gab_urls:
-            print(f"\n--- Attempting to scrape: {url} ---")
-            
-            # Get current window handles before opening a new tab
-            current_handles = driver.window_handles
-            
-            # Open a new tab
-            driver.execute_script(f"window.open('{url}', '_blank');")
+    """Main function to orchestrate the scraping process from a predefined list of URLs."""
+    print("Initializing WebDriver...")
+    # Resolved once here and passed to every worker, so workers never probe the cache or CDN.
+    # Not done at import time: worker processes may re-import this module.
+    chromedriver_path = ChromeDriverManager().install()
+    driver = webdriver.Chrome(service=ChromeService(executable_path=chromedriver_path), options=make_chrome_options(profile_dir=LOGIN_PROFILE_DIR))
+    output_file = open(output_filename, 'wb')
 
-            # Wait for a new window handle to appear
+    try:
+        driver.get("https://gab.com/auth/sign_in")
+        # Gab redirects away from the sign-in page when the saved profile is still logged in
+        if "sign_in" not in driver.current_url:
+            print("Already logged in from the saved Chrome profile; skipping manual login.")
+        else:
+            # === MANUAL LOGIN STEP ===
+            print("\n" + "="*60)
+            print("ACTION REQUIRED: Please log in to your Gab account in the browser window.")
+            print(f"The script will continue as soon as you're logged in (waiting up to {LOGIN_TIMEOUT} seconds).")
+            print("DO NOT close the browser window.")
+            print("="*60 + "\n")
+            # Logged in once we've left the sign-in page and the signed-in UI has rendered
             try:
-                WebDriverWait(driver, 20).until(lambda d: len(d.window_handles) > len(current_handles))
-                # Find the new window handle
-                new_window_handle = [handle for handle in driver.window_handles if handle not in current_handles][0]
-                driver.switch_to.window(new_window_handle)
-                print(f"  Switched to new tab for {url}.")
+                WebDriverWait(driver, LOGIN_TIMEOUT).until(
+                    lambda d: "sign_in" not in d.current_url
+                    and d.find_elements(By.CSS_SELECTOR, "[data-testid='compose-form'], a[href*='/home']")
+                )
+                print("Login detected.")
             except TimeoutException:
-                print(f"  Timed out waiting for new window for {url}. This URL will be skipped.")
-                # If a new window didn't open or wasn't detected, ensure we're back to the main window
-                driver.switch_to.window(main_window_handle)
-                continue # Skip this URL and move to the next
+                print(f"No login detected after {LOGIN_TIMEOUT} seconds; continuing with the current session.")
 
-            post_details = get_post_details(url, driver)
+        # Hand the logged-in session to the workers; this browser is only needed for the login.
+        # Workers can't open the profile themselves since Chrome locks a profile to one instance.
+        login_cookies = driver.get_cookies()
+        driver.quit()
 
-            # Close the current tab (the one just scraped)
-            driver.close()
-            # Switch back to the main window handle
-            driver.switch_to.window(main_window_handle)
-            
+        # Define your list of Gab post URLs here
+        with open("gab_urls_4.json", "rb") as f:
+            gab_urls = orjson.loads(f.read())
+
+        # Posts are independent, so shard them across worker processes with a Chrome each.
+        # executor.map yields results in URL order as they finish.
+        print(f"Starting {SCRAPER_WORKERS} scraping workers...")
+        executor = ProcessPoolExecutor(
+            max_workers=SCRAPER_WORKERS,
+            initializer=init_worker,
+            initargs=(chromedriver_path, login_cookies),
+        )
+        for url, post_details in zip(gab_urls, executor.map(scrape_one, gab_urls)):
             if post_details:
-                dataset.append(post_details)
-                print(f"  Successfully scraped post from {url}. Total valid scraped: {len(dataset)}")
-                print(f"  Posts scraped so far: {len(dataset)}")
+                output_file.write(orjson.dumps(post_details) + b"\n")
+                output_file.flush()
+                scraped_count += 1
+                print(f"  Successfully scraped post from {url}. Total valid scraped: {scraped_count}")
             else:
                 print(f"  Post {url} did not meet criteria or failed to scrape. Skipping.")
-            
-            time.sleep(1) # Short pause between posts
 
-        driver.quit()
+        executor.shutdown()
 
         print("\n--- Scraping Complete ---")
-        if dataset:
-            print(f"Successfully scraped {len(dataset)} posts that meet all criteria.")
-            output_filename = f"gab_data_from_list_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                json.dump(dataset, f, indent=4, ensure_ascii=False)
-            print(f"Data saved to {output_filename}")
+        if scraped_count:
+            print(f"Successfully scraped {scraped_count} posts that meet all criteria.")
         else:
             print("No posts found that meet the specified criteria within the provided list of URLs.")
     
     except KeyboardInterrupt:
-        print("\n⚡️ Scrape interrupted by user. Dumping partial data…")
-        # always quit the browser
-        try: driver.quit()
-        except: pass
-
-        dump_filename = f"gab_data_interrupt_dump_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
-        with open(dump_filename, 'w', encoding='utf-8') as f:
-            json.dump(dataset, f, indent=4, ensure_ascii=False)
-        print(f"Partial data saved to {dump_filename}")
+        print("\n⚡️ Scrape interrupted by user.")
         sys.exit(0)
 
     except Exception as e:
         print(f"\n!!! Unexpected error: {e}")
-        try: driver.quit()
-        except: pass
-        dump_filename = f"gab_data_error_dump_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
-        with open(dump_filename, 'w', encoding='utf-8') as f:
-            json.dump(dataset, f, indent=4, ensure_ascii=False)
-        print(f"Partial data has been dumped to {dump_filename}")
         sys.exit(1)
 
     finally:
         # on a clean run without interrupts/errors, ensure browser is closed
         try: driver.quit()
         except: pass
+        # Don't start any URLs that were still queued when we stopped
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        output_file.close()
+        print(f"{scraped_count} posts saved to {output_filename}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,16 +8,90 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-import json
-from urllib.parse import urljoin
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.remote.client_config import ClientConfig
+import orjson
+from urllib.parse import urljoin, urlparse
 import re
+import asyncio
+import aiohttp
+import lxml.html
+import queue
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # -- Configuration --
 POSTS_TO_SCRAPE = 1000 # Keep this low for testing, user can adjust. Script will continue until this many *valid* posts are found.
-SCROLL_PAUSE_TIME = 2
+SCROLL_PAUSE_TIME = 2 # Longest wait for a scroll to load more content
+SCROLL_SETTLE_TIME = 0.3 # Once content starts loading, seconds without DOM changes before it counts as loaded
 MAX_SCROLLS = 500 # Increased max scrolls to allow deeper search for old posts
 MIN_POST_AGE_DAYS = 0 # Post must be at least 14 days old
 MIN_REPLIES_REQUIRED = 0 # Post must have at least 20 replies
+POST_FETCH_CONCURRENCY = 10 # Posts fetched from the API at the same time
+POST_FETCH_TIMEOUT = 30 # Seconds before an API request is abandoned
+BROWSER_WORKERS = 4 # Extra logged-in Chrome sessions loading posts the API couldn't return, in parallel
+# Gab's Mastodon-compatible status endpoint; "/context" on the end lists the replies
+GAB_API_STATUS_URL = "https://gab.com/api/v1/statuses/{post_id}"
+LOGIN_TIMEOUT = 180 # Seconds to wait for the manual login to complete
+WEBDRIVER_POOL_SIZE = 8 # Keep-alive HTTP connections to chromedriver; urllib3's default is 1
+LOG_LEVEL = logging.INFO # Set to logging.DEBUG to print every scraped field, reply and scroll step
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+logger = logging.getLogger(__name__)
+
+# -- Precompiled patterns (used for every post and reply) --
+COUNT_SUFFIX_MULTIPLIERS = {
+    'K': 1_000, 'k': 1_000,
+    'M': 1_000_000, 'm': 1_000_000,
+    'B': 1_000_000_000, 'b': 1_000_000_000,
+    'T': 1_000_000_000_000,
+}
+COUNT_RE = re.compile(r'(\d[\d,.]*\s*[KMBTkmb]?)')
+TZ_PAREN_RE = re.compile(r'\s*\([^)]+\)')
+AUTHOR_RE = re.compile(r'gab.com/([^/]+)/posts/')
+# A Gab post link: https://gab.com/<user>/posts/<alphanumeric id of 6+ chars>
+POST_URL_RE = re.compile(r'https://gab\.com/[^/?#]+/posts/([A-Za-z0-9]{6,})(?:[/?#]|$)')
+LONG_WORD_RE = re.compile(r'[a-zA-Z]{5,}')
+# Matched against src attribute values of the parsed page, so elements never need re-serializing
+MEDIA_SRC_RE = re.compile(r'https?://m3\.gab\.com/media_attachments/[^"]+\.(?:jpg|jpeg|png|gif|webp)[^"]*')
+# Attachment file types kept from the API, the same ones MEDIA_SRC_RE accepts on the page
+MEDIA_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+# Every interaction count in one alternation, so the page HTML is scanned once instead of
+# once per count. Each alternative has its own named group; scrape_interactions keeps the
+# first match of each and prefers them in the same order as the separate searches did.
+INTERACTIONS_RE = re.compile(
+    r'<span\s+class="_3u7ZG\s+_UuSG\s+_3_54N\s+a8-QN\s+_2cSLK\s+L4pn5\s+RiX17"\s+data-text="(?P<likes_data_text>\d+)"[^>]*>'
+    r'|<span\s+class="_3u7ZG\s+_UuSG\s+_3_54N\s+a8-QN\s+_2cSLK\s+L4pn5\s+RiX17"[^>]*>(?P<likes_text>\d+)\s*</span>'
+    r'|(?i:(?P<reposts>\d[\d,.]*[KMBTkmb]?)\s*Reposts)'
+    r'|(?i:(?P<quotes>\d[\d,.]*[KMBTkmb]?)\s*Quotes)'
+    r'|(?i:<button[^>]*\s(?:title|aria-label)="(?P<views_button>\d[\d,.]*[KMBTkmb]?)\s*views"[^>]*>)'
+    r'|(?i:(?P<views_span>[\d,.]*[KMBTkmb]?)\s*<span[^>]*>views</span>)'
+    r'|(?i:(?P<views_text>\d[\d,.]*[KMBTkmb]?)\s*views)'
+)
+
+# Where to look for the post body, tried in order (relative to the main post element)
+POST_TEXT_XPATHS = [
+    './/div[contains(@class, "post-content")]//span[@data-text-content]',
+    './/div[contains(@class, "post-content")]//div[@data-text-content]',
+    './/div[contains(@class, "post-content")]//p',
+    './/div[contains(@class, "post-content-body")]',
+    './/div[contains(@class, "break-words") and not(contains(@class, "post-header")) and not(contains(@class, "flex")) and not(contains(@class, "text-sm"))]',
+    './/div[contains(@class, "post-content")]',
+    './/p[string-length(normalize-space(.)) > 10 and not(ancestor::div[contains(@class, "post-header")])]',
+    './/div[not(contains(@class, "hidden")) and string-length(normalize-space(.)) > 10 and not(contains(@class, "meta")) and not(contains(@class, "header")) and not(contains(@class, "text-gray"))]',
+    './/div[contains(@class, "post-description")]',
+]
+# Where to look for the post timestamp, tried in order
+POST_TIMESTAMP_XPATHS = [
+    './/time',
+    './/div[contains(@class, "post-meta")]//time',
+    './/a[contains(@href, "/posts/") and contains(@href, "/posts/")]//time',
+    './/span[contains(@class, "timestamp")]',
+]
+REPLY_ELEMENTS_XPATHS = [
+    '//div[starts-with(@data-comment, "")]',
+    '//div[contains(@class, "_2hI-g") and contains(@class, "_3d6X0") and contains(@class, "_1qZTN") and contains(@class, "_36P3U") and starts-with(@data-comment, "")]'
+]
 
 # Custom Expected Condition to handle multiple possible conditions
 class any_of_conditions:
@@ -34,6 +108,36 @@ class any_of_conditions:
                 pass
         return False
 
+# Scrolls arguments[0] (or the page, if null) to the bottom, then resolves as soon as the
+# content it loads has settled: a MutationObserver restarts a short settle timer on every DOM
+# change once the height has grown. Gives up after arguments[1] ms if nothing loads.
+# Resolves with [height before, height after].
+SCROLL_AND_WAIT_JS = """
+const [element, timeoutMs, settleMs] = arguments;
+const done = arguments[arguments.length - 1];
+const target = element || document.body;
+const startHeight = target.scrollHeight;
+let settleTimer = null;
+const observer = new MutationObserver(() => {
+  if (target.scrollHeight === startHeight) return;
+  clearTimeout(settleTimer);
+  settleTimer = setTimeout(finish, settleMs);
+});
+const timeoutTimer = setTimeout(finish, timeoutMs);
+function finish() {
+  observer.disconnect();
+  clearTimeout(timeoutTimer);
+  clearTimeout(settleTimer);
+  done([startHeight, target.scrollHeight]);
+}
+observer.observe(target, {childList: true, subtree: true});
+if (element) {
+  element.scrollTop = element.scrollHeight;
+} else {
+  window.scrollTo(0, document.body.scrollHeight);
+}
+"""
+
 # Helper function to extract numerical count from a string
 def extract_count_from_string(text_to_parse):
     """
@@ -43,24 +147,23 @@ def extract_count_from_string(text_to_parse):
     if not text_to_parse:
         return 0
 
+    # Most counts are plain integers like '257', which need no regex
+    text_to_parse = text_to_parse.strip()
+    if text_to_parse.isascii() and text_to_parse.isdigit():
+        return int(text_to_parse)
+
     try:
         # Regex to find numbers, potentially with commas or decimals, and optional K/M/B/T suffix
         # Added \s* to handle potential spaces around the number before K/M/B/T
-        match = re.search(r'(\d[\d,.]*\s*[KMBTkmb]?)', text_to_parse)
+        match = COUNT_RE.search(text_to_parse)
         if match:
             num_str = match.group(1).replace(',', '').strip()
-            
+
             # Handle K, M, B, T suffixes
-            if 'K' in num_str.upper():
-                return int(float(num_str.replace('K', '')) * 1000)
-            elif 'M' in num_str.upper():
-                return int(float(num_str.replace('M', '')) * 1000000)
-            elif 'B' in num_str.upper():
-                return int(float(num_str.replace('B', '')) * 1000000000)
-            elif 'T' in num_str.upper():
-                return int(float(num_str.replace('T', '')) * 1000000000000)
-            else:
-                return int(float(num_str))
+            multiplier = COUNT_SUFFIX_MULTIPLIERS.get(num_str[-1])
+            if multiplier:
+                return int(float(num_str[:-1]) * multiplier)
+            return int(float(num_str))
     except (ValueError, AttributeError):
         pass
     return 0
@@ -75,7 +178,7 @@ def parse_gab_datetime(dt_string):
         return None # Return None if string is empty
     
     # Remove the parenthesized timezone part, e.g., "(Pacific Daylight Time)"
-    clean_dt_string = re.sub(r'\s*\([^)]+\)', '', dt_string).strip()
+    clean_dt_string = TZ_PAREN_RE.sub('', dt_string).strip()
     try:
         # Format string: "%a %b %d %Y %H:%M:%S GMT%z"
         # Example: "Mon Jul 07 2025 07:59:42 GMT-0700"
@@ -84,19 +187,333 @@ def parse_gab_datetime(dt_string):
     except ValueError:
         return None # Return None on parse error
 
+# Helper function to apply the MIN_POST_AGE_DAYS filter
+def is_old_enough(timestamp_iso):
+    """Returns True if the post passes the age filter. Posts with no parseable timestamp fail it."""
+    if not timestamp_iso:
+        logger.warning("    Warning: Could not parse post timestamp. Cannot apply age filter. Skipping post to be safe.")
+        return False
+
+    post_datetime = datetime.fromisoformat(timestamp_iso)
+    # Ensure comparison is timezone-aware
+    if post_datetime.tzinfo is None:
+        post_datetime = post_datetime.replace(tzinfo=timezone.utc)
+
+    current_datetime_utc = datetime.now(timezone.utc)
+    age_difference = current_datetime_utc - post_datetime
+
+    if age_difference.days < MIN_POST_AGE_DAYS:
+        logger.info("    Post is only %s days old, which is less than %s days. Skipping post.", age_difference.days, MIN_POST_AGE_DAYS)
+        return False
+    return True
+
+# Helper function to scrape reactions, reposts, quotes, and views from a post page's HTML
+def scrape_interactions(post_data, page_source):
+    """Fills the interaction counts in `post_data` using regexes over the post's HTML."""
+    logger.debug("    Attempting to scrape interactions (reactions, reposts, quotes, views) from the post HTML...")
+
+    first_matches = {}
+    for match in INTERACTIONS_RE.finditer(page_source):
+        first_matches.setdefault(match.lastgroup, match.group(match.lastgroup))
+        if len(first_matches) == INTERACTIONS_RE.groups:
+            break
+
+    def first_count(*group_names):
+        for name in group_names:
+            if name in first_matches:
+                return extract_count_from_string(first_matches[name])
+        return 0
+
+    # Reactions (formerly 'likes')
+    post_data["likes"] = first_count("likes_data_text", "likes_text")
+    logger.debug("    Reactions (Likes): %s", post_data['likes'])
+
+    # Reposts
+    post_data["reposts_count"] = first_count("reposts")
+    logger.debug("    Reposts: %s", post_data['reposts_count'])
+
+    # Quotes
+    post_data["quotes_count"] = first_count("quotes")
+    logger.debug("    Quotes: %s", post_data['quotes_count'])
+
+    # Views
+    post_data["views"] = first_count("views_button", "views_span", "views_text")
+    logger.debug("    Views: %s", post_data['views'])
+
+# Helper function to match the first of several XPaths under an lxml element
+def first_xpath_match(element, xpaths):
+    """Returns the first element matched by `xpaths`, tried in order, or None."""
+    for xpath in xpaths:
+        matches = element.xpath(xpath)
+        if matches:
+            return matches[0]
+    return None
+
+
+async def fetch_api_json(session, api_url):
+    """GETs one Gab API URL. Returns the decoded JSON, or None if the request failed."""
+    try:
+        async with session.get(api_url) as response:
+            response.raise_for_status()
+            return await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.warning("  API request failed for %s: %r", api_url, e)
+        return None
+
+async def fetch_post_from_api(session, semaphore, post_url):
+    """Fetches a post's status and its reply context from the API. Either is None on failure."""
+    post_id = POST_URL_RE.match(post_url).group(1)
+    status_url = GAB_API_STATUS_URL.format(post_id=post_id)
+    async with semaphore:
+        return await asyncio.gather(
+            fetch_api_json(session, status_url),
+            fetch_api_json(session, status_url + "/context"),
+        )
+
+async def fetch_posts_from_api(post_urls, cookies):
+    """
+    Fetches the posts from the API concurrently, at most POST_FETCH_CONCURRENCY at a time, with
+    the browser's login cookies and user agent. Returns (status, context) pairs in `post_urls` order.
+    """
+    semaphore = asyncio.Semaphore(POST_FETCH_CONCURRENCY)
+    async with aiohttp.ClientSession(
+        headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
+        cookies={cookie["name"]: cookie["value"] for cookie in cookies},
+        timeout=aiohttp.ClientTimeout(total=POST_FETCH_TIMEOUT),
+    ) as session:
+        return await asyncio.gather(*(fetch_post_from_api(session, semaphore, url) for url in post_urls))
+
+def api_html_to_text(content_html):
+    """Plain text of a status's `content` HTML, one line per paragraph or <br>."""
+    if not content_html or not content_html.strip():
+        return ""
+    root = lxml.html.fragment_fromstring(content_html, create_parent="div")
+    for elem in root.iter("br", "p"):
+        elem.tail = "\n" + (elem.tail or "")
+    return root.text_content().strip()
+
+def api_datetime(created_at):
+    """Parses an API `created_at` (e.g. "2025-07-07T14:59:42.000Z") into an aware datetime."""
+    if not created_at:
+        return None
+    try:
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def api_timestamp_raw(created_at):
+    """
+    Formats an API `created_at` the way the page's JS Date string reads (in UTC, e.g.
+    "Mon Jul 07 2025 14:59:42 GMT+0000 (Coordinated Universal Time)"), so both scrape
+    paths write the same `timestamp` format. Returns None if it can't be parsed.
+    """
+    dt = api_datetime(created_at)
+    if dt is None:
+        return None
+    return dt.astimezone(timezone.utc).strftime("%a %b %d %Y %H:%M:%S GMT+0000 (Coordinated Universal Time)")
+
+def api_age_text(created_at):
+    """Relative age like the page shows next to a reply ("45s", "5m", "2h", "3d", "Jul 7", "Jul 7, 2024")."""
+    dt = api_datetime(created_at)
+    if dt is None:
+        return None
+    now = datetime.now(timezone.utc)
+    seconds = int((now - dt).total_seconds())
+    if seconds < 60:
+        return f"{max(seconds, 0)}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    if seconds < 86400:
+        return f"{seconds // 3600}h"
+    if seconds < 7 * 86400:
+        return f"{seconds // 86400}d"
+    if dt.year == now.year:
+        return f"{dt:%b} {dt.day}"
+    return f"{dt:%b} {dt.day}, {dt.year}"
+
+def api_image_urls(status):
+    """
+    URLs of a status's attachments that are image files, by the same extension rule as
+    MEDIA_SRC_RE, so GIFs are kept and video (including a gifv's mp4) is left out.
+    """
+    return [
+        media["url"] for media in status.get("media_attachments") or []
+        if media.get("url") and urlparse(media["url"]).path.lower().endswith(MEDIA_EXTENSIONS)
+    ]
+
+def media_urls(element):
+    """Returns the Gab media image URLs under a parsed (lxml) element, deduplicated in page order."""
+    return list(dict.fromkeys(src for src in element.xpath('.//@src') if MEDIA_SRC_RE.match(src)))
+
+def scrape_replies_from_tree(tree):
+    """Scrapes the replies present in a parsed post page."""
+    replies = []
+    seen_identifiers = set()
+
+    for xp in REPLY_ELEMENTS_XPATHS:
+        for reply_elem in tree.xpath(xp):
+            reply_id = reply_elem.get('data-comment')
+            if not reply_id or reply_id in seen_identifiers:
+                continue
+            seen_identifiers.add(reply_id)
+
+            reply_info = {"reply_id": reply_id}
+
+            text_elems = reply_elem.xpath('.//div[@tabindex="0"]/p')
+            if text_elems:
+                reply_info["reply_text"] = text_elems[0].text_content().strip() or "No substantive text found."
+            else:
+                reply_info["reply_text"] = "No text found (Timeout/Not Found)."
+
+            reply_info["reply_timestamp_raw"] = "N/A"
+            reply_info["reply_age_text"] = "N/A"
+            reply_info["reply_timestamp_iso"] = "N/A"
+            timestamp_elems = reply_elem.xpath('.//a[contains(@href, "/posts/")]/span/time')
+            if timestamp_elems:
+                reply_info["reply_timestamp_raw"] = timestamp_elems[0].get('datetime')
+                reply_info["reply_age_text"] = timestamp_elems[0].text_content().strip()
+                reply_info["reply_timestamp_iso"] = parse_gab_datetime(reply_info["reply_timestamp_raw"])
+
+            reply_info["image_urls"] = media_urls(reply_elem)
+
+            replies.append(reply_info)
+            logger.debug("    Scraped Reply %s: Text='%s...', Age='%s', Image URLs=%s", len(replies), reply_info['reply_text'][:50], reply_info['reply_age_text'], len(reply_info['image_urls']))
+
+    return replies
+
+def scrape_main_post(post_url, main_post_element):
+    """
+    Scrapes author, text, image URLs and timestamp from the main post's parsed (lxml) element
+    and applies the age filter. Returns the post details so far, or None if the post is rejected.
+    """
+    post_id = post_url.split('/')[-1].split('?')[0].split('#')[0]
+    post_data = {"post_id": post_id, "post_url": post_url, "image_urls": [], "replies": []}
+
+    # Scrape author username from URL
+    logger.debug("    Attempting to scrape author username from URL...")
+    match = AUTHOR_RE.search(post_url)
+    if match:
+        post_data["author_username"] = "@" + match.group(1)
+    else:
+        post_data["author_username"] = "N/A (Author not found in URL pattern)"
+    logger.debug("    Author username: %s", post_data['author_username'])
+
+    # Scrape post text (Revised for robustness against picking up header info)
+    logger.debug("    Attempting to scrape post text...")
+    text_element = first_xpath_match(main_post_element, POST_TEXT_XPATHS)
+    if text_element is None:
+        post_data["text"] = "No primary text content found."
+        logger.debug("    Warning: Post text content not found.")
+    else:
+        raw_text = text_element.text_content().strip()
+
+        is_likely_header = False
+        if len(raw_text) < 30 and (("·" in raw_text or "\n" in raw_text) and not LONG_WORD_RE.search(raw_text)):
+            is_likely_header = True
+        if raw_text.startswith(post_data["author_username"]) and len(raw_text) < 50:
+             is_likely_header = True
+
+        if is_likely_header:
+             post_data["text"] = "No primary text content found."
+             logger.debug("    Detected header-like info in text, setting to 'No primary text content found.'.")
+        else:
+             post_data["text"] = raw_text
+
+        if len(post_data["text"]) > 100:
+            logger.debug("    Post text (first 100 chars): %s...", post_data['text'][:100])
+        else:
+            logger.debug("    Post text: %s", post_data['text'])
+
+    # Scrape image URLs from the main post element's src attributes
+    logger.debug("    Attempting to scrape image URLs from main post element...")
+    post_data["image_urls"] = media_urls(main_post_element)
+    logger.debug("    Found %s image URLs.", len(post_data['image_urls']))
+
+    # Scrape timestamp and apply age filter
+    logger.debug("    Attempting to scrape timestamp and apply age filter...")
+    timestamp_elem = first_xpath_match(main_post_element, POST_TIMESTAMP_XPATHS)
+    if timestamp_elem is None:
+        logger.warning("    Warning: Timestamp not found for main post. Cannot apply age filter. Skipping post.")
+        return None
+    raw_timestamp = timestamp_elem.get('datetime') or timestamp_elem.text_content().strip()
+    post_data["timestamp"] = raw_timestamp
+    post_data["timestamp_iso"] = parse_gab_datetime(raw_timestamp)
+    logger.debug("    Timestamp: %s", post_data['timestamp'])
+    logger.debug("    Timestamp ISO: %s", post_data['timestamp_iso'])
+
+    if not is_old_enough(post_data["timestamp_iso"]):
+        return None
+
+    return post_data
+
+def get_post_details_from_api(post_url, status, context):
+    """
+    Builds a post's details and replies from its API status and context JSON, applying the
+    same filters as get_post_details. Returns None if the post is rejected.
+    """
+    post_id = status["id"]
+    post_data = {"post_id": post_id, "post_url": post_url, "image_urls": [], "replies": []}
+
+    post_data["author_username"] = "@" + status["account"]["acct"]
+    logger.debug("    Author username: %s", post_data['author_username'])
+
+    post_data["text"] = api_html_to_text(status.get("content")) or "No primary text content found."
+    logger.debug("    Post text (first 100 chars): %s", post_data['text'][:100])
+
+    post_data["image_urls"] = api_image_urls(status)
+    logger.debug("    Found %s image URLs.", len(post_data['image_urls']))
+
+    post_data["timestamp"] = api_timestamp_raw(status.get("created_at"))
+    post_data["timestamp_iso"] = parse_gab_datetime(post_data["timestamp"])
+    logger.debug("    Timestamp ISO: %s", post_data['timestamp_iso'])
+    if not is_old_enough(post_data["timestamp_iso"]):
+        return None
+
+    post_data["likes"] = status.get("favourites_count", 0)
+    post_data["reposts_count"] = status.get("reblogs_count", 0)
+    # Gab-specific counts, not part of the Mastodon status schema
+    post_data["quotes_count"] = status.get("quotes_count", 0)
+    post_data["views"] = status.get("views_count", 0)
+    logger.debug("    Reactions (Likes): %s, Reposts: %s, Quotes: %s, Views: %s", post_data['likes'], post_data['reposts_count'], post_data['quotes_count'], post_data['views'])
+
+    for reply in context.get("descendants") or []:
+        reply_info = {
+            "reply_id": reply["id"],
+            "reply_text": api_html_to_text(reply.get("content")) or "No substantive text found.",
+            "reply_timestamp_raw": api_timestamp_raw(reply.get("created_at")) or "N/A",
+            # The API has no relative age, so it's worked out from created_at
+            "reply_age_text": api_age_text(reply.get("created_at")) or "N/A",
+            "reply_timestamp_iso": parse_gab_datetime(api_timestamp_raw(reply.get("created_at"))) or "N/A",
+            "image_urls": api_image_urls(reply),
+        }
+        post_data["replies"].append(reply_info)
+    logger.debug("  Found %s replies.", len(post_data['replies']))
+
+    if len(post_data["replies"]) < MIN_REPLIES_REQUIRED:
+        logger.info("  Post only has %s replies, which is less than the required %s. Skipping post.", len(post_data['replies']), MIN_REPLIES_REQUIRED)
+        return None
+
+    return post_data
+
+
+def scroll_and_wait_for_growth(driver, scroll_pause_time, element=None):
+    """
+    Scrolls `element` (or the page) to its bottom and waits, in the browser, for the content
+    loaded by that scroll. Returns (height before, height after).
+    """
+    return driver.execute_async_script(
+        SCROLL_AND_WAIT_JS, element, int(scroll_pause_time * 1000), int(SCROLL_SETTLE_TIME * 1000)
+    )
 
 def scroll_to_end(driver, scroll_pause_time=SCROLL_PAUSE_TIME):
     """Scrolls down the page to load more content, for infinite scrolling feeds."""
-    print(f"Initiating scroll sequence to load more content...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(scroll_pause_time)
-    new_height = driver.execute_script("return document.body.scrollHeight")
+    logger.debug("Initiating scroll sequence to load more content...")
+    last_height, new_height = scroll_and_wait_for_growth(driver, scroll_pause_time)
     if new_height == last_height:
-        print(f"  Reached end of scrollable content or no new content loaded.")
+        logger.debug("  Reached end of scrollable content or no new content loaded.")
         return False # Indicate no new content was loaded
     else:
-        print(f"  Scrolled. New page height: {new_height}px")
+        logger.debug("  Scrolled. New page height: %spx", new_height)
         return True # Indicate new content was loaded
 
 # Helper function to scroll within a specific element
@@ -106,241 +523,77 @@ def scroll_element_to_end(driver, element_xpath, scroll_pause_time=1, max_scroll
         scroll_container = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.XPATH, element_xpath))
         )
-        print(f"  Attempting to scroll element: {element_xpath}")
-        last_height = driver.execute_script("return arguments[0].scrollHeight", scroll_container)
+        logger.debug("  Attempting to scroll element: %s", element_xpath)
         scroll_count = 0
         while scroll_count < max_scrolls:
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-            time.sleep(scroll_pause_time)
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_container)
+            last_height, new_height = scroll_and_wait_for_growth(driver, scroll_pause_time, scroll_container)
             if new_height == last_height:
-                print(f"    Reached end of scrollable element or no new content after {scroll_count + 1} scrolls.")
+                logger.debug("    Reached end of scrollable element or no new content after %s scrolls.", scroll_count + 1)
                 break
-            last_height = new_height
             scroll_count += 1
-            print(f"    Scrolled element {scroll_count} times. Element height: {new_height}px")
-        print("  Finished scrolling element.")
+            logger.debug("    Scrolled element %s times. Element height: %spx", scroll_count, new_height)
+        logger.debug("  Finished scrolling element.")
         return True
     except TimeoutException:
-        print(f"  Scrollable element not found or timed out: {element_xpath}")
+        logger.debug("  Scrollable element not found or timed out: %s", element_xpath)
         return False
     except Exception as e:
-        print(f"  Error scrolling element {element_xpath}: {e}")
+        logger.warning("  Error scrolling element %s: %s", element_xpath, e)
         return False
 
 def get_post_details(post_url, driver):
     """Navigates to a specific post URL to scrape its full details and replies."""
-    print(f"\n  Navigating to post detail page: {post_url}")
+    logger.debug("\n  Navigating to post detail page: %s", post_url)
     try:
         driver.get(post_url)
-        time.sleep(3) # Increased initial wait for full page render
 
         post_id = post_url.split('/')[-1].split('?')[0].split('#')[0]
 
-        # Explicitly wait for the main post element to be present.
+        # Explicitly wait for the main post element to be present; this is the page's readiness signal.
         WebDriverWait(driver, 25).until( 
             EC.presence_of_element_located((By.CSS_SELECTOR, f"div[data-id='{post_id}']"))
         )
-        print(f"  Main post container (data-id='{post_id}') found on detail page.")
+        logger.debug("  Main post container (data-id='%s') found on detail page.", post_id)
     except TimeoutException:
-        print(f"  Error: Timed out waiting for main post container (data-id) on post page. Content might not be visible: {post_url}")
+        logger.warning("  Error: Timed out waiting for main post container (data-id) on post page. Content might not be visible: %s", post_url)
         return None
     except WebDriverException as e:
-        print(f"  WebDriver error loading {post_url}: {e.msg if e.msg else str(e)}")
+        logger.warning("  WebDriver error loading %s: %s", post_url, e.msg if e.msg else str(e))
         return None
     except Exception as e:
-        print(f"  An unexpected error occurred while loading {post_url}: {e}")
+        logger.warning("  An unexpected error occurred while loading %s: %s", post_url, e)
         return None
 
-    post_data = {"post_id": post_id, "post_url": post_url, "image_urls": [], "replies": []}
-    main_post_element = None
-
     try:
-        main_post_element = driver.find_element(By.CSS_SELECTOR, f"div[data-id='{post_id}']")
-        print("  Main post element successfully located for scraping.")
+        main_post_html = driver.find_element(By.CSS_SELECTOR, f"div[data-id='{post_id}']").get_attribute('outerHTML')
+        logger.debug("  Main post element successfully located for scraping.")
 
-        # Scrape author username from URL
-        try:
-            print("    Attempting to scrape author username from URL...")
-            match = re.search(r'gab.com/([^/]+)/posts/', post_url)
-            if match:
-                post_data["author_username"] = "@" + match.group(1)
-            else:
-                post_data["author_username"] = "N/A (Author not found in URL pattern)"
-            print(f"    Author username: {post_data['author_username']}")
-        except Exception as e:
-            print(f"    Error scraping author username from URL: {e}")
-            post_data["author_username"] = "Error (URL parse failed)"
-
-
-        # Scrape post text (Revised for robustness against picking up header info)
-        try:
-            print("    Attempting to scrape post text...")
-            text_element = WebDriverWait(main_post_element, 10).until(
-                any_of_conditions(
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]//span[@data-text-content]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]//div[@data-text-content]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]//p')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content-body")]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "break-words") and not(contains(@class, "post-header")) and not(contains(@class, "flex")) and not(contains(@class, "text-sm"))]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-content")]')), 
-                    EC.presence_of_element_located((By.XPATH, './/p[string-length(normalize-space(.)) > 10 and not(ancestor::div[contains(@class, "post-header")])]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[not(contains(@class, "hidden")) and string-length(normalize-space(.)) > 10 and not(contains(@class, "meta")) and not(contains(@class, "header")) and not(contains(@class, "text-gray"))]')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-description")]'))
-                )
-            )
-            raw_text = text_element.text.strip()
-            
-            is_likely_header = False
-            if len(raw_text) < 30 and (("·" in raw_text or "\n" in raw_text) and not re.search(r'[a-zA-Z]{5,}', raw_text)): 
-                is_likely_header = True
-            if raw_text.startswith(post_data["author_username"]) and len(raw_text) < 50:
-                 is_likely_header = True
-
-            if is_likely_header:
-                 post_data["text"] = "No primary text content found."
-                 print("    Detected header-like info in text, setting to 'No primary text content found.'.")
-            else:
-                 post_data["text"] = raw_text
-            
-            if len(post_data["text"]) > 100:
-                print(f"    Post text (first 100 chars): {post_data['text'][:100]}...")
-            else:
-                print(f"    Post text: {post_data['text']}")
-
-        except TimeoutException:
-            post_data["text"] = "No primary text content found (timed out)."
-            print("    Warning: Post text content element timed out.")
-        except NoSuchElementException:
-            post_data["text"] = "No primary text content found."
-            print("    Warning: Post text content not found.")
-        except Exception as e:
-            print(f"    Error scraping post text: {e}")
-            post_data["text"] = "Error retrieving text."
-
-
-        # Scrape image URLs using regex on the main_post_element's outerHTML
-        try:
-            print("    Attempting to scrape image URLs from main post element's HTML...")
-            main_post_html = main_post_element.get_attribute('outerHTML')
-            image_urls = []
-            img_src_pattern = re.compile(r'src="(https?://m3\.gab\.com/media_attachments/[^"]+\.(?:jpg|jpeg|png|gif|webp)[^"]*)"')
-            
-            for match in img_src_pattern.finditer(main_post_html):
-                image_urls.append(match.group(1))
-            
-            post_data["image_urls"] = list(set(image_urls))
-            print(f"    Found {len(post_data['image_urls'])} image URLs.")
-        except Exception as e:
-            post_data["image_urls"] = []
-            print(f"    Error scraping image URLs from main post element: {e}")
-
-
-        # Scrape timestamp and apply age filter
-        try:
-            print("    Attempting to scrape timestamp and apply age filter...")
-            timestamp_elem = WebDriverWait(main_post_element, 10).until(
-                any_of_conditions(
-                    EC.presence_of_element_located((By.TAG_NAME, 'time')),
-                    EC.presence_of_element_located((By.XPATH, './/div[contains(@class, "post-meta")]//time')),
-                    EC.presence_of_element_located((By.XPATH, './/a[contains(@href, "/posts/") and contains(@href, "/posts/")]//time')),
-                    EC.presence_of_element_located((By.XPATH, './/span[contains(@class, "timestamp")]'))
-                )
-            )
-            raw_timestamp = timestamp_elem.get_attribute('datetime') or timestamp_elem.text.strip()
-            post_data["timestamp"] = raw_timestamp
-            post_data["timestamp_iso"] = parse_gab_datetime(raw_timestamp)
-            print(f"    Timestamp: {post_data['timestamp']}")
-            print(f"    Timestamp ISO: {post_data['timestamp_iso']}")
-
-            # Age filter check
-            if post_data["timestamp_iso"]:
-                post_datetime = datetime.fromisoformat(post_data["timestamp_iso"])
-                # Ensure comparison is timezone-aware
-                if post_datetime.tzinfo is None:
-                    post_datetime = post_datetime.replace(tzinfo=timezone.utc)
-                
-                current_datetime_utc = datetime.now(timezone.utc)
-                age_difference = current_datetime_utc - post_datetime
-
-                if age_difference.days < MIN_POST_AGE_DAYS:
-                    print(f"    Post is only {age_difference.days} days old, which is less than {MIN_POST_AGE_DAYS} days. Skipping post.")
-                    return None
-            else:
-                print("    Warning: Could not parse post timestamp. Cannot apply age filter. Skipping post to be safe.")
-                return None
-
-        except TimeoutException:
-            post_data["timestamp"] = "N/A (Timeout)"
-            post_data["timestamp_iso"] = "N/A"
-            print("    Warning: Timestamp element timed out. Cannot apply age filter. Skipping post.")
-            return None
-        except NoSuchElementException:
-            post_data["timestamp"] = "N/A"
-            post_data["timestamp_iso"] = "N/A"
-            print("    Warning: Timestamp not found for main post. Cannot apply age filter. Skipping post.")
-            return None
-        except Exception as e:
-            print(f"    Error scraping timestamp or applying age filter: {e}. Skipping post.")
-            post_data["timestamp"] = "Error"
-            post_data["timestamp_iso"] = "Error"
+        # Parse the post's HTML once, in-process, instead of polling each field with WebDriverWait
+        post_data = scrape_main_post(post_url, lxml.html.fromstring(main_post_html))
+        if post_data is None:
             return None
 
-        # Scrape reactions, reposts, quotes, and views from the entire page source using regex
-        print("    Attempting to scrape interactions (reactions, reposts, quotes, views) from page source...")
-        page_source = driver.page_source
-        
-        # Reactions (formerly 'likes')
-        reactions_match = re.search(r'<span\s+class="_3u7ZG\s+_UuSG\s+_3_54N\s+a8-QN\s+_2cSLK\s+L4pn5\s+RiX17"\s+data-text="(\d+)"[^>]*>', page_source)
-        if reactions_match:
-            post_data["likes"] = extract_count_from_string(reactions_match.group(1))
-        else:
-            reactions_text_match = re.search(r'<span\s+class="_3u7ZG\s+_UuSG\s+_3_54N\s+a8-QN\s+_2cSLK\s+L4pn5\s+RiX17"[^>]*>(\d+)\s*</span>', page_source)
-            if reactions_text_match:
-                post_data["likes"] = extract_count_from_string(reactions_text_match.group(1))
-            else:
-                post_data["likes"] = 0
-        print(f"    Reactions (Likes): {post_data['likes']}")
-
-        # Reposts
-        reposts_match = re.search(r'(\d[\d,.]*[KMBTkmb]?)\s*Reposts', page_source, re.IGNORECASE)
-        post_data["reposts_count"] = extract_count_from_string(reposts_match.group(1)) if reposts_match else 0
-        print(f"    Reposts: {post_data['reposts_count']}")
-
-        # Quotes
-        quotes_match = re.search(r'(\d[\d,.]*[KMBTkmb]?)\s*Quotes', page_source, re.IGNORECASE)
-        post_data["quotes_count"] = extract_count_from_string(quotes_match.group(1)) if quotes_match else 0
-        print(f"    Quotes: {post_data['quotes_count']}")
-
-        # Views
-        views_button_match = re.search(r'<button[^>]*\s(?:title|aria-label)="(\d[\d,.]*[KMBTkmb]?)\s*views"[^>]*>', page_source, re.IGNORECASE)
-        if views_button_match:
-            post_data["views"] = extract_count_from_string(views_button_match.group(1))
-        else:
-            views_span_match = re.search(r'([\d,.]*[KMBTkmb]?)\s*<span[^>]*>views</span>', page_source, re.IGNORECASE)
-            if views_span_match:
-                post_data["views"] = extract_count_from_string(views_span_match.group(1))
-            else:
-                views_text_match = re.search(r'(\d[\d,.]*[KMBTkmb]?)\s*views', page_source, re.IGNORECASE)
-                post_data["views"] = extract_count_from_string(views_text_match.group(1)) if views_text_match else 0
-        print(f"    Views: {post_data['views']}")
+        # Scrape reactions, reposts, quotes, and views using regex. The stats bar is inside the
+        # main post element, so its HTML (already read above) is scanned instead of page_source,
+        # which would serialize the whole DOM over the WebDriver connection
+        scrape_interactions(post_data, main_post_html)
 
 
     except TimeoutException as e:
-        print(f"  Timeout waiting for a critical sub-element of the main post. Error: {e}. Skipping post.")
+        logger.warning("  Timeout waiting for a critical sub-element of the main post. Error: %s. Skipping post.", e)
         return None
     except NoSuchElementException as e:
-        print(f"  Could not find a critical sub-element within the main post on {post_url}. Error: {e}. Skipping post.")
+        logger.warning("  Could not find a critical sub-element within the main post on %s. Error: %s. Skipping post.", post_url, e)
         return None
     except StaleElementReferenceException:
-        print(f"  Stale element encountered on {post_url} while scraping main post details. Skipping.")
+        logger.warning("  Stale element encountered on %s while scraping main post details. Skipping.", post_url)
         return None
     except Exception as e:
-        print(f"  An unexpected general error occurred while scraping main post details for {post_url}: {e}. Skipping post.")
+        logger.warning("  An unexpected general error occurred while scraping main post details for %s: %s. Skipping post.", post_url, e)
         return None
 
     # --- SCRAPE REPLIES SECTION ---
-    print("\n  Attempting to scrape replies...")
+    logger.debug("\n  Attempting to scrape replies...")
     
     # Identify a scrollable container for replies, then scroll it
     comment_section_xpaths = [
@@ -364,302 +617,288 @@ def get_post_details(post_url, driver):
             break
     
     if not scrolled_comments:
-        print("  Could not find or scroll a dedicated comments container. Proceeding with visible replies.")
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        logger.debug("  Could not find or scroll a dedicated comments container. Proceeding with visible replies.")
+        scroll_to_end(driver, scroll_pause_time=2)
 
 
     try:
-        time.sleep(2) 
-
-        reply_element_xpaths = [
-            '//div[starts-with(@data-comment, "")]',
-            '//div[contains(@class, "_2hI-g") and contains(@class, "_3d6X0") and contains(@class, "_1qZTN") and contains(@class, "_36P3U") and starts-with(@data-comment, "")]'
-        ]
-
+        # Polls until the first reply is rendered rather than sleeping a fixed time
         WebDriverWait(driver, 15).until(
-            any_of_conditions(*[EC.presence_of_element_located((By.XPATH, xp)) for xp in reply_element_xpaths])
+            any_of_conditions(*[EC.presence_of_element_located((By.XPATH, xp)) for xp in REPLY_ELEMENTS_XPATHS])
         )
         
-        all_reply_elements = []
-        for xp in reply_element_xpaths:
-            all_reply_elements.extend(driver.find_elements(By.XPATH, xp))
-        
-        unique_reply_elements = []
-        seen_identifiers = set()
-
-        for elem in all_reply_elements:
-            try:
-                elem_identifier = elem.get_attribute('data-comment')
-                if elem_identifier and elem_identifier not in seen_identifiers:
-                    unique_reply_elements.append(elem)
-                    seen_identifiers.add(elem_identifier)
-            except StaleElementReferenceException:
-                print("  Stale element encountered during reply collection, skipping.")
-                continue 
-
-        print(f"  Found {len(unique_reply_elements)} unique reply elements for detailed scraping.")
-
-        for i, reply_elem in enumerate(unique_reply_elements):
-            reply_info = {}
-            reply_info["reply_id"] = reply_elem.get_attribute('data-comment') or f"reply_{i}_{datetime.now().timestamp()}"
-
-            # Removed: Scrape Reply Author
-            # reply_author = "N/A"
-            # try:
-            #     author_elem = WebDriverWait(reply_elem, 3).until( 
-            #         any_of_conditions(
-            #             EC.presence_of_element_located((By.XPATH, './/strong[contains(@class, "_3XMA1")]')),
-            #             EC.presence_of_element_located((By.XPATH, './/a[contains(@href, "/")]/strong')),
-            #             EC.presence_of_element_located((By.XPATH, './/a[contains(@href, "/")]/span[contains(@class, "font-bold")]'))
-            #         )
-            #     )
-            #     reply_author = author_elem.text.strip()
-            #     if not reply_author.startswith('@') and len(reply_author) > 0:
-            #         reply_author = "@" + reply_author 
-            #     elif len(reply_author) == 0:
-            #         reply_author = "N/A (Empty String)"
-            # except (TimeoutException, NoSuchElementException):
-            #     reply_author = "N/A (Author Not Found)"
-            # except Exception as e:
-            #     print(f"      Error scraping reply {i} author: {e}")
-            #     reply_author = "Error"
-            # reply_info["reply_author"] = reply_author
-
-            # Scrape Reply Text
-            reply_text = "No text found."
-            try:
-                text_elem = WebDriverWait(reply_elem, 3).until( 
-                    EC.presence_of_element_located((By.XPATH, './/div[@tabindex="0"]/p'))
-                )
-                raw_reply_text = text_elem.text.strip()
-                if len(raw_reply_text) > 0:
-                    reply_text = raw_reply_text
-                else:
-                    reply_text = "No substantive text found."
-
-            except (TimeoutException, NoSuchElementException):
-                reply_text = "No text found (Timeout/Not Found)."
-            except Exception as e:
-                print(f"      Error retrieving reply {i} text: {e}")
-                reply_text = "Error retrieving text."
-            reply_info["reply_text"] = reply_text
-
-            # Scrape Reply Timestamp
-            reply_info["reply_timestamp_raw"] = "N/A"
-            reply_info["reply_age_text"] = "N/A"
-            reply_info["reply_timestamp_iso"] = "N/A"
-            try:
-                timestamp_elem = WebDriverWait(reply_elem, 3).until( 
-                    EC.presence_of_element_located((By.XPATH, './/a[contains(@href, "/posts/")]/span/time'))
-                )
-                reply_info["reply_timestamp_raw"] = timestamp_elem.get_attribute('datetime')
-                reply_info["reply_age_text"] = timestamp_elem.text.strip()
-                
-                reply_info["reply_timestamp_iso"] = parse_gab_datetime(reply_info["reply_timestamp_raw"])
-
-            except (TimeoutException, NoSuchElementException):
-                print(f"      Warning: Reply {i} timestamp element timed out or not found.")
-            except Exception as e:
-                print(f"      Error scraping reply {i} timestamp: {e}")
-            
-            # Removed: Scrape Reply Likes (Reactions)
-            # reply_info["reply_likes"] = 0
-            # try:
-            #     like_count_elem = WebDriverWait(reply_elem, 3).until(
-            #         any_of_conditions(
-            #             EC.presence_of_element_located((By.XPATH, './/span[contains(@class, "RiX17") and @data-text and not(text()="Reply") and not(text()="Repost") and normalize-space(@data-text) != "" and string-length(@data-text) > 0]')),
-            #             EC.presence_of_element_located((By.XPATH, './/span[contains(@class, "RiX17") and not(text()="Reply") and not(text()="Repost") and normalize-space(.) != "" and string-length(.) > 0]')),
-            #             EC.presence_of_element_located((By.XPATH, './/button[contains(@aria-label, "reaction")]//span[not(contains(@class, "hidden"))]'))
-            #         )
-            #     )
-            #     raw_likes = like_count_elem.get_attribute('data-text') or like_count_elem.text.strip()
-            #     reply_info["reply_likes"] = extract_count_from_string(raw_likes)
-
-            # except (TimeoutException, NoSuchElementException):
-            #     reply_info["reply_likes"] = 0
-            #     print(f"      Warning: Reply {i} likes element timed out or not found.")
-            # except Exception as e:
-            #     print(f"      Warning: Error scraping reply {i} likes: {e}")
-
-            # Removed: Number of Replies to this Reply (Nested Replies)
-            # reply_info["nested_replies_count"] = 0
-            # try:
-            #     span_view_replies_elem = WebDriverWait(reply_elem, 3).until(
-            #         EC.presence_of_element_located((By.XPATH, './/span[contains(@data-text, "View") and contains(@data-text, "reply")]'))
-            #     )
-            #     reply_info["nested_replies_count"] = extract_count_from_string(span_view_replies_elem.get_attribute('data-text'))
-            # except (TimeoutException, NoSuchElementException):
-            #     reply_info["nested_replies_count"] = 0
-            # except Exception as e:
-            #     print(f"      Warning: Error scraping nested replies count for reply {i}: {e}")
-
-            # Add: Scrape Image URLs for replies
-            reply_info["image_urls"] = []
-            try:
-                reply_html = reply_elem.get_attribute('outerHTML')
-                img_src_pattern = re.compile(r'src="(https?://m3\.gab\.com/media_attachments/[^"]+\.(?:jpg|jpeg|png|gif|webp)[^"]*)"')
-                
-                for match in img_src_pattern.finditer(reply_html):
-                    reply_info["image_urls"].append(match.group(1))
-                reply_info["image_urls"] = list(set(reply_info["image_urls"])) # Remove duplicates
-                if reply_info["image_urls"]:
-                    print(f"      Found {len(reply_info['image_urls'])} image URLs for reply {i+1}.")
-            except Exception as e:
-                print(f"      Error scraping image URLs for reply {i}: {e}")
-
-            post_data["replies"].append(reply_info)
-            print(f"    Scraped Reply {i+1}: Text='{reply_info['reply_text'][:50]}...', Age='{reply_info['reply_age_text']}', Image URLs={len(reply_info['image_urls'])}")
+        # Snapshot the rendered replies once and parse them in-process, instead of a
+        # WebDriverWait/get_attribute round-trip per field per reply
+        replies_html = driver.execute_script("return document.body.outerHTML")
+        post_data["replies"] = scrape_replies_from_tree(lxml.html.fromstring(replies_html))
+        logger.debug("  Found %s unique reply elements.", len(post_data['replies']))
 
     except TimeoutException:
-        print("  No replies found or timed out waiting for replies on this post (after potential scrolling).")
-    except StaleElementReferenceException:
-        print("  Stale element encountered during reply scraping main loop. Some replies might be missed. Retrying...")
+        logger.debug("  No replies found or timed out waiting for replies on this post (after potential scrolling).")
     except Exception as e:
-        print(f"  An error occurred while trying to find or process reply elements: {e}")
+        logger.warning("  An error occurred while trying to find or process reply elements: %s", e)
 
     # Reply count filter
     if len(post_data["replies"]) < MIN_REPLIES_REQUIRED:
-        print(f"  Post only has {len(post_data['replies'])} replies, which is less than the required {MIN_REPLIES_REQUIRED}. Skipping post.")
+        logger.info("  Post only has %s replies, which is less than the required %s. Skipping post.", len(post_data['replies']), MIN_REPLIES_REQUIRED)
         return None
 
     return post_data
 
-def main():
-    """Main function to orchestrate the scraping process."""
-    print("Initializing WebDriver...")
+def make_chrome_options(headless=False):
+    """
+    Chrome options shared by the login, Explore and worker browsers. Only the login browser
+    needs a window; the others run `headless`, skipping painting to the screen entirely.
+    """
     chrome_options = Options()
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        # Headless defaults to an 800x600 viewport, which changes how much the feed loads per scroll
+        chrome_options.add_argument("--window-size=1920,1080")
+        for arg in ("--disable-gpu", "--disable-extensions", "--disable-dev-shm-usage",
+                    "--disable-background-networking", "--disable-sync"):
+            chrome_options.add_argument(arg)
+        # Scraping sessions don't download images or web fonts: image URLs are read from the HTML,
+        # never rendered. The login browser loads everything so captchas and the sign-in form work.
+        # Stylesheets stay on because the Explore feed and comment containers only scroll with their CSS applied.
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        # driver.get returns at DOMContentLoaded instead of waiting for every subresource;
+        # get_post_details waits for the post element itself anyway
+        chrome_options.page_load_strategy = "eager"
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    return chrome_options
 
-    service = ChromeService(executable_path=ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+def make_driver(service, chrome_options):
+    """
+    Starts a Chrome session on the already running chromedriver `service`. Every WebDriver
+    command is an HTTP request to chromedriver; these reuse a keep-alive pool of
+    WEBDRIVER_POOL_SIZE connections, so concurrent commands don't queue on a single one.
+    """
+    client_config = ClientConfig(
+        remote_server_addr=service.service_url,
+        keep_alive=True,
+        init_args_for_pool_manager={"init_args_for_pool_manager": {"maxsize": WEBDRIVER_POOL_SIZE}},
+    )
+    return webdriver.Remote(
+        command_executor=ChromeRemoteConnection(client_config=client_config),
+        options=chrome_options,
+    )
+
+def make_logged_in_driver(service, chrome_options, cookies):
+    """Starts a Chrome session with make_driver and copies the login `cookies` into it."""
+    new_driver = make_driver(service, chrome_options)
+    # Cookies can only be set for the domain currently loaded
+    new_driver.get("https://gab.com/")
+    for cookie in cookies:
+        try:
+            new_driver.add_cookie(cookie)
+        except WebDriverException as e:
+            logger.warning("  Could not copy cookie %s to new browser: %s", cookie.get('name'), e.msg if e.msg else str(e))
+    return new_driver
+
+def make_worker_drivers(service, chrome_options, cookies, count=BROWSER_WORKERS):
+    """
+    Starts `count` Chrome sessions carrying the login `cookies`, in a queue so each worker
+    thread takes one. A session has a single current window, so threads can't share one.
+    """
+    pool = queue.Queue()
+    for _ in range(count):
+        pool.put(make_logged_in_driver(service, chrome_options, cookies))
+    return pool
+
+def close_worker_drivers(pool):
+    """Quits every session in a make_worker_drivers queue."""
+    while not pool.empty():
+        try:
+            pool.get_nowait().quit()
+        except Exception:
+            pass
 
-    # === MANUAL LOGIN STEP ===
-    print("\n" + "="*60)
-    print("ACTION REQUIRED: Please log in to your Gab account in the browser window.")
-    print("The script will wait for 90 seconds to allow you to complete the login.")
-    print("DO NOT close the browser window.")
-    print("="*60 + "\n")
-    driver.get("https://gab.com/auth/sign_in")
-    time.sleep(90) # Give ample time for manual login
+def scrape_with_worker_driver(pool, post_url):
+    """Runs get_post_details on a worker session from `pool`, returning the session afterwards."""
+    worker_driver = pool.get()
+    try:
+        return get_post_details(post_url, worker_driver)
+    finally:
+        pool.put(worker_driver)
 
-    print("\nResuming script. Navigating to Gab Explore page...")
-    driver.get("https://gab.com/explore")
+def main():
+    """Main function to orchestrate the scraping process."""
+    logger.info("Initializing WebDriver...")
+    chrome_options = make_chrome_options()
+    headless_options = make_chrome_options(headless=True)
 
+    service = ChromeService(executable_path=ChromeDriverManager().install())
+    # Started here rather than by webdriver.Chrome so the session can use make_driver's connection pool
+    service.start()
+    output_filename = f"gab_data_two_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.jsonl"
+    output_file = None
+    scraped_count = 0
+    driver = None
+    worker_drivers = None
+    browser_executor = None
+    # Everything started below is shut down in the finally block, even if a scrape raises or the run is interrupted
     try:
-        WebDriverWait(driver, 45).until(
-            any_of_conditions(
-                EC.presence_of_element_located((By.XPATH, '//main//a[contains(@href, "/posts/")]')),
-                EC.presence_of_element_located((By.XPATH, '//div[contains(@class, "flex-1") and contains(@class, "items-center")]'))
+        driver = make_driver(service, chrome_options)
+
+        # === MANUAL LOGIN STEP ===
+        logger.info("\n%s", "="*60)
+        logger.info("ACTION REQUIRED: Please log in to your Gab account in the browser window.")
+        logger.info("The script will continue as soon as you're logged in (waiting up to %s seconds).", LOGIN_TIMEOUT)
+        logger.info("DO NOT close the browser window.")
+        logger.info("%s\n", "="*60)
+        driver.get("https://gab.com/auth/sign_in")
+        # Logged in once we've left the sign-in page and the signed-in UI has rendered
+        try:
+            WebDriverWait(driver, LOGIN_TIMEOUT).until(
+                lambda d: "sign_in" not in d.current_url
+                and d.find_elements(By.CSS_SELECTOR, "[data-testid='compose-form'], a[href*='/home']")
             )
-        )
-        print("Initial content or post elements detected on Explore page.")
-    except TimeoutException:
-        print("ERROR: Timed out waiting for initial content on Explore page after login.")
-        print("This could mean Gab's layout has changed, login failed, or there's a network issue.")
-        driver.quit()
-        return
-    except Exception as e:
-        print(f"An unexpected error occurred after navigating to Explore page: {e}")
+            logger.info("Login detected.")
+        except TimeoutException:
+            logger.warning("No login detected after %s seconds; continuing with the current session.", LOGIN_TIMEOUT)
+
+        # The visible window was only needed for logging in; the rest of the run uses
+        # headless sessions carrying the same cookies
+        login_cookies = driver.get_cookies()
         driver.quit()
-        return
+        logger.info("Restarting the browser headless...")
+        driver = make_logged_in_driver(service, headless_options, login_cookies)
 
-    dataset = []
-    processed_urls = set()
-    scroll_attempts = 0
+        logger.info("\nResuming script. Navigating to Gab Explore page...")
+        driver.get("https://gab.com/explore")
+
+        try:
+            WebDriverWait(driver, 45).until(
+                any_of_conditions(
+                    EC.presence_of_element_located((By.XPATH, '//main//a[contains(@href, "/posts/")]')),
+                    EC.presence_of_element_located((By.XPATH, '//div[contains(@class, "flex-1") and contains(@class, "items-center")]'))
+                )
+            )
+            logger.info("Initial content or post elements detected on Explore page.")
+        except TimeoutException:
+            logger.error("ERROR: Timed out waiting for initial content on Explore page after login.")
+            logger.error("This could mean Gab's layout has changed, login failed, or there's a network issue.")
+            return
+        except Exception as e:
+            logger.error("An unexpected error occurred after navigating to Explore page: %s", e)
+            return
+
+        # Posts the API can't return are loaded by these sessions in parallel, while
+        # this driver stays on the Explore feed
+        logger.info("Starting %s worker browsers...", BROWSER_WORKERS)
+        worker_drivers = make_worker_drivers(service, headless_options, login_cookies)
+        browser_executor = ThreadPoolExecutor(max_workers=BROWSER_WORKERS)
+
+        # Each post is written as one JSON line as soon as it's scraped, so an interrupt or
+        # crash keeps everything collected so far
+        output_file = open(output_filename, 'wb')
+        processed_urls = set()
+        # Found but not yet fetched, in feed order; carried over when a scroll finds more than is still needed
+        pending_urls = {}
+        scroll_attempts = 0
     
-    # Loop until enough posts are found or max scrolls reached
-    while len(dataset) < POSTS_TO_SCRAPE and scroll_attempts < MAX_SCROLLS:
-        print(f"\n--- Scroll Attempt {scroll_attempts + 1}/{MAX_SCROLLS} ---")
-        # Scroll to load more content
-        new_content_loaded = scroll_to_end(driver)
-        scroll_attempts += 1
+        # Loop until enough posts are found or max scrolls reached
+        while scraped_count < POSTS_TO_SCRAPE and scroll_attempts < MAX_SCROLLS:
+            logger.info("\n--- Scroll Attempt %s/%s ---", scroll_attempts + 1, MAX_SCROLLS)
+            # Scroll to load more content
+            new_content_loaded = scroll_to_end(driver)
+            scroll_attempts += 1
         
-        if not new_content_loaded:
-            print("No new content loaded; retrying indefinitely…")            
-            time.sleep(2)
-            continue
-
-        print(f"Collecting post URLs from the Explore page after scroll attempt {scroll_attempts}...")
-        current_link_elements = driver.find_elements(By.XPATH, '//main//a[contains(@href, "/posts/")]')
-        print(f"Found {len(current_link_elements)} raw potential post links on the page.")
-
-        # Collect newly found unique URLs from the current page state
-        newly_found_urls = []
-        for link_elem in current_link_elements:
-            try:
-                raw_url = link_elem.get_attribute('href')
-                url = urljoin(driver.current_url, raw_url)
-                url = ''.join(c for c in url if not c.isspace()).strip()
-
-                TARGET_SUBSTRING = "/posts/"
-                if url and TARGET_SUBSTRING in url and url.startswith("https://gab.com/"):
-                    post_id_candidate = url.split('/posts/')[-1].split('/')[0].split('#')[0].split('?')[0]
-                    if len(post_id_candidate) > 5 and post_id_candidate.isalnum() and url not in processed_urls:
-                        newly_found_urls.append(url)
-                        processed_urls.add(url) # Add to processed set immediately to avoid re-processing
-            except StaleElementReferenceException:
-                print("  Stale element encountered while collecting URLs. Skipping this link.")
+            if not new_content_loaded and not pending_urls:
+                logger.info("No new content loaded; retrying indefinitely…")
+                time.sleep(2)
                 continue
-            except Exception as e:
-                print(f"  Error collecting URL from link element: {e}")
-                pass
-        
-        print(f"Found {len(newly_found_urls)} new unique post URLs to process in this scroll.")
-
-        main_window_handle = driver.current_window_handle
-        old_window_handles = set(driver.window_handles)
 
-        for url in newly_found_urls:
-            if len(dataset) >= POSTS_TO_SCRAPE:
-                print(f"Reached target of {POSTS_TO_SCRAPE} posts. Stopping URL processing for this scroll.")
-                break
-
-            print(f"\n--- Attempting to scrape and filter: {url} ---")
-            
-            # Open a new tab and switch to it
-            driver.execute_script(f"window.open('{url}', '_blank');")
+            logger.debug("Collecting post URLs from the Explore page after scroll attempt %s...", scroll_attempts)
+            # One page_source read and lxml parse, instead of a get_attribute round-trip per link
+            explore_url = driver.current_url
+            hrefs = lxml.html.fromstring(driver.page_source).xpath('//main//a[contains(@href, "/posts/")]/@href')
+            logger.debug("Found %s raw potential post links on the page.", len(hrefs))
+
+            # Collect newly found unique URLs from the current page state; dict.fromkeys drops
+            # the links repeated on the page in one pass while keeping feed order
+            page_urls = dict.fromkeys(''.join(urljoin(explore_url, raw_url).split()) for raw_url in hrefs)
+            newly_found_urls = [url for url in page_urls if url not in processed_urls and url not in pending_urls and POST_URL_RE.match(url)]
+            pending_urls.update(dict.fromkeys(newly_found_urls))
+
+            logger.info("Found %s new unique post URLs to process in this scroll.", len(newly_found_urls))
+
+            # Fetch only as many as are still needed; the rest wait for the next iteration, in
+            # case some of these fail the filters. Marked processed only once they're fetched.
+            urls_to_scrape = list(pending_urls)[:POSTS_TO_SCRAPE - scraped_count]
+            for url in urls_to_scrape:
+                del pending_urls[url]
+            processed_urls.update(urls_to_scrape)
+
+            # Fetch these posts from the API all at once, with the browser's login session
+            api_results = asyncio.run(fetch_posts_from_api(urls_to_scrape, driver.get_cookies()))
+
+            scraped = []
+            browser_urls = []
+            for url, (status, context) in zip(urls_to_scrape, api_results):
+                logger.info("\n--- Attempting to scrape and filter: %s ---", url)
+                if status is not None and context is not None:
+                    try:
+                        scraped.append((url, get_post_details_from_api(url, status, context)))
+                    except (KeyError, TypeError) as e:
+                        # A status missing a field we index; the rendered page may still have it
+                        logger.warning("  Unexpected API response for %s (%r); queued for the worker browsers.", url, e)
+                        browser_urls.append(url)
+                else:
+                    # The API refused or failed (e.g. 403 or rate limited), so render the page instead
+                    logger.info("  Post not available from the API; queued for the worker browsers.")
+                    browser_urls.append(url)
+
+            # Posts that need rendering load BROWSER_WORKERS at a time, one per worker session
+            future_urls = {browser_executor.submit(scrape_with_worker_driver, worker_drivers, url): url for url in browser_urls}
+            for future in as_completed(future_urls):
+                try:
+                    post_details = future.result()
+                except Exception as e:
+                    # One failed post is recorded as skipped rather than ending the run
+                    logger.warning("  Worker browser failed on %s: %s", future_urls[future], e)
+                    post_details = None
+                scraped.append((future_urls[future], post_details))
+
+            for url, post_details in scraped:
+                if post_details:
+                    output_file.write(orjson.dumps(post_details) + b"\n")
+                    output_file.flush()
+                    scraped_count += 1
+                    logger.info("  Successfully scraped a valid post. Total valid scraped: %s/%s", scraped_count, POSTS_TO_SCRAPE)
+                else:
+                    logger.info("  Post %s did not meet criteria or failed to scrape. Skipping.", url)
+    finally:
+        if browser_executor:
+            # Lets in-flight posts finish so their sessions are back in the queue to be closed
+            browser_executor.shutdown(cancel_futures=True)
+        if worker_drivers:
+            close_worker_drivers(worker_drivers)
+        if driver:
             try:
-                WebDriverWait(driver, 20).until(lambda driver: len(driver.window_handles) > len(old_window_handles))
-                new_window_handle = (set(driver.window_handles) - old_window_handles).pop()
-                driver.switch_to.window(new_window_handle)
-            except TimeoutException:
-                print(f"  Timed out waiting for new window for {url}. Closing tab and continuing.")
-                # If window doesn't open, ensure we close potentially stuck new tab and switch back
-                if len(driver.window_handles) > len(old_window_handles):
-                     driver.close()
-                driver.switch_to.window(main_window_handle)
-                continue # Skip this URL and move to next
-
-            post_details = get_post_details(url, driver)
-
-            # Close the current tab and switch back to the original tab
-            driver.close()
-            driver.switch_to.window(main_window_handle)
-            
-            if post_details:
-                dataset.append(post_details)
-                print(f"  Successfully scraped a valid post. Total valid scraped: {len(dataset)}/{POSTS_TO_SCRAPE}")
-            else:
-                print(f"  Post {url} did not meet criteria or failed to scrape. Skipping.")
-            
-            time.sleep(1) # Short pause between posts
-
-    driver.quit()
-
-    print("\n--- Scraping Complete ---")
-    if dataset:
-        print(f"Successfully scraped {len(dataset)} posts that meet all criteria.")
-        output_filename = f"gab_data_two_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(dataset, f, indent=4, ensure_ascii=False)
-        print(f"Data saved to {output_filename}")
+                driver.quit()
+            except Exception:
+                pass
+        service.stop()
+        if output_file:
+            output_file.close()
+
+    logger.info("\n--- Scraping Complete ---")
+    if scraped_count:
+        logger.info("Successfully scraped %s posts that meet all criteria.", scraped_count)
+        logger.info("Data saved to %s", output_filename)
     else:
-        print("No posts found that meet the specified criteria (age >= 30 days and replies >= 20) within the maximum scroll attempts.")
+        logger.info("No posts found that meet the specified criteria (age >= 30 days and replies >= 20) within the maximum scroll attempts.")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
     main()
 